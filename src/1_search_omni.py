@@ -1,6 +1,7 @@
 import argparse
 import time
 import json
+import csv
 import pandas as pd
 import requests
 import arxiv
@@ -9,6 +10,7 @@ from unpywall import Unpywall
 from tqdm import tqdm
 import os
 import re
+import math
 from urllib.parse import urlparse
 import datetime
 from dotenv import load_dotenv
@@ -16,18 +18,27 @@ import sys
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import warnings
+import threading
+import queue
+import sqlite3
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import fitz  # PyMuPDF
+import functools
 try:
-    from unpywall.utils import UnpywallCredentials
-    from unpywall import Unpywall
-    # Monkeypatch or configure cache if library supports it.
-    # If not, we just accept no cache or use environmental variable if applicable.
-    # Looking at unpywall source (common knowledge), it uses `requests_cache`.
     import requests_cache
-    cache_path = os.path.join(os.path.dirname(__file__), "../data/unpaywall_cache")
-    requests_cache.install_cache(cache_path, backend='sqlite', expire_after=86400)
-except: pass
+    HAS_REQUESTS_CACHE = True
+except ImportError:
+    HAS_REQUESTS_CACHE = False
+
+# Disk cache for API lookups (OpenAlex + Unpaywall), keyed on URL+params.
+# Everything else (PDF downloads) bypasses the cache.
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../data")
+API_CACHE_SETTINGS = dict(
+    backend='sqlite', expire_after=86400, allowable_methods=('GET',), allowable_codes=(200,),
+    urls_expire_after={'api.openalex.org': 86400, 'api.unpaywall.org': 86400,
+                       '*': requests_cache.DO_NOT_CACHE if HAS_REQUESTS_CACHE else 0},
+)
 
 # --- Suppress Warnings (Must be before imports that trigger them) ---
 warnings.filterwarnings("ignore")
@@ -46,36 +57,277 @@ try:
 except ImportError:
     HAS_GENAI = False
 
-# Robust Request Session
-def get_session():
-    session = requests.Session()
-    retry = Retry(connect=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry)
+# Optional: orjson for fast OpenAlex response parsing
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Optional: Aho-Corasick automaton for the multi-keyword Front-Matter scan
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+# Optional: Bloom filter for memory-bounded deduplication
+try:
+    from pybloom_live import ScalableBloomFilter
+    HAS_BLOOM = True
+except ImportError:
+    HAS_BLOOM = False
+
+# Streaming limits for the Full-Text Audit
+MAX_PDF_BYTES = 50 * 1024 * 1024   # Content-Length above this is rejected without reading
+AUDIT_BYTE_CAP = 2 * 1024 * 1024   # Front-Matter is always within the first 2 MB
+PDF_FETCH_DEADLINE = 20            # Wall-clock seconds per download (read timeout is per chunk)
+PROBE_CACHE_TTL = 7 * 86400        # How long a URL that definitely serves no PDF is skipped
+PROBE_CACHE_SOFT_TTL = 6 * 3600    # HTML and other non-PDF answers (may be a bot challenge or interstitial)
+# ProbeCache reasons that hold for PROBE_CACHE_TTL; any other reason expires after PROBE_CACHE_SOFT_TTL
+PROBE_PERMANENT_REASONS = ('HTTP 404', 'HTTP 410', 'Bad PDF magic')
+
+# Verticals OR-ed together per OpenAlex query in the iterative loop
+VERTICAL_BATCH_SIZE = 4
+
+# OpenAlex paging (pages are fetched concurrently, ~10 req/s per IP is polite)
+OA_WORKS_URL = "https://api.openalex.org/works"
+OA_PER_PAGE = 200
+OA_MAX_PAGES = 50
+OA_PAGE_WORKERS = 6
+# Only fields read by _parse_oa_results (abstract feeds Description, so it stays)
+OA_SELECT_FIELDS = "id,title,publication_year,open_access,authorships,abstract_inverted_index,doi,keywords,cited_by_count"
+
+# Stage 1 output, written row by row as papers are accepted (an interrupted run keeps its results)
+CATALOG_CSV = "research_catalog.csv"
+CATALOG_COLUMNS = ['Title', 'Authors', 'Original_Filename', 'Publication_Date', 'Category', 'Description',
+                   'Is_Paywalled', 'Is_Downloaded', 'Source_URL', 'DOI', '_Source', 'Citation_Count', 'Search_Vertical']
+
+# Proactive per-host request budgets (requests/s); OpenAlex asks for <= 10 req/s per IP.
+# Semantic Scholar and Unpaywall are queried through their client libraries, which
+# open their own sessions, so a budget here would never be spent for them.
+API_RATE_LIMITS = {'api.openalex.org': 10}
+RATE_LIMIT_RETRIES = 2             # Resends of a 429 after the host's bucket has been drained
+
+class RateLimiter:
+    """Token bucket shared by threads: acquire() blocks until a request may go out."""
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def backoff(self, seconds):
+        """Server pushed back (429): every thread waits ~seconds before the next request."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that spends a host's token before each request. Mounted under
+    CachedSession it only runs on cache misses, so cached hits are never throttled.
+    """
+    def __init__(self, limiters=None, **kwargs):
+        self.limiters = limiters or {}
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        limiter = self.limiters.get(urlparse(request.url).hostname)
+        if limiter is None: return super().send(request, **kwargs)
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            limiter.acquire()
+            response = super().send(request, **kwargs)
+            if response.status_code != 429: return response
+            # Throttle the whole host, then resend once the bucket allows it
+            retry_after = response.headers.get('Retry-After', '')
+            limiter.backoff(int(retry_after) if retry_after.isdigit() else 5)
+            if attempt == RATE_LIMIT_RETRIES: return response
+            response.close()
+
+# Robust Request Session (disk-cached for API hosts when requests_cache is available)
+# pool_size should cover every thread sharing the session, otherwise urllib3
+# discards the extra keep-alive connections and each request re-handshakes.
+def get_session(cache_name=None, pool_size=10, rate_limits=None):
+    if cache_name and HAS_REQUESTS_CACHE:
+        session = requests_cache.CachedSession(cache_name, **API_CACHE_SETTINGS)
+    elif HAS_REQUESTS_CACHE:
+        # install_cache() patches requests.Session globally; bypass it for uncached traffic
+        session = requests_cache.patcher.OriginalSession()
+    else:
+        session = requests.Session()
+    # 429 is left to RateLimitedAdapter (it throttles the host instead of retrying blindly)
+    retry = Retry(connect=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504],
+                  raise_on_status=False, respect_retry_after_header=False)
+    limiters = {host: RateLimiter(rate) for host, rate in (rate_limits or {}).items()}
+    adapter = RateLimitedAdapter(limiters, max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
     session.mount('http://', adapter)
     session.mount('https://', adapter)
     return session
 
+class SeenFilter:
+    """
+    Memory-bounded duplicate tracker (two-tier).
+    A Bloom filter answers "definitely new" in O(1); Bloom hits are confirmed
+    against an exact LRU of the most recent keys so a false positive never
+    drops a paper. Behaves like a plain set if pybloom_live is not installed.
+    """
+    def __init__(self, capacity=500_000, error_rate=0.001, exact_window=50_000):
+        self._bloom = ScalableBloomFilter(initial_capacity=capacity, error_rate=error_rate) if HAS_BLOOM else None
+        self._window = exact_window if HAS_BLOOM else None
+        self._recent = OrderedDict()
+
+    def add(self, key):
+        if self._bloom is not None: self._bloom.add(key)
+        self._recent[key] = None
+        self._recent.move_to_end(key)
+        if self._window and len(self._recent) > self._window:
+            self._recent.popitem(last=False)
+
+    def update(self, keys):
+        for key in keys: self.add(key)
+
+    def __contains__(self, key):
+        if self._bloom is not None and key not in self._bloom: return False
+        return key in self._recent
+
+    def __len__(self):
+        return len(self._recent)
+
+class ProbeCache:
+    """
+    Persistent record of URLs that did not serve a PDF (404, HTML landing page, ...),
+    so repeat crawls of a topic skip the GET. Shared by the download workers.
+    Definitive failures are kept for ttl, anything that may recover for soft_ttl.
+    """
+    def __init__(self, path, ttl=PROBE_CACHE_TTL, soft_ttl=PROBE_CACHE_SOFT_TTL):
+        self.ttl = ttl
+        self.soft_ttl = soft_ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS pdf_probe (url TEXT PRIMARY KEY, reason TEXT, ts INTEGER)")
+        self._db.commit()
+
+    def is_known_bad(self, url):
+        with self._lock:
+            row = self._db.execute("SELECT reason, ts FROM pdf_probe WHERE url = ?", (url,)).fetchone()
+        if row is None: return False
+        ttl = self.ttl if row[0] in PROBE_PERMANENT_REASONS else self.soft_ttl
+        return row[1] > int(time.time()) - ttl
+
+    def mark_bad(self, url, reason):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO pdf_probe VALUES (?, ?, ?)", (url, reason, int(time.time())))
+            self._db.commit()
+
+# Bare publication year ("2021"), as OpenAlex returns it
+_RE_YEAR = re.compile(r'^\d{4}$')
+
+def normalize_url(url):
+    """Dedup key for URLs: scheme, 'www.', host case and trailing slash ignored."""
+    if not url: return ''
+    host, _, path = str(url).strip().split('://', 1)[-1].partition('/')
+    host = host.lower()
+    if host.startswith('www.'): host = host[4:]
+    return f"{host}/{path}".rstrip('/')
+
+@functools.lru_cache(maxsize=4096)
+def format_date(date_str):
+    """'2021' -> '2021/01/01', 'YYYY-MM-DD' -> 'YYYY/MM/DD' (memoized: a crawl sees few distinct dates)."""
+    if _RE_YEAR.match(date_str): return f"{date_str}/01/01"
+    return date_str.replace('-', '/')
+
+class _TitleKeyTable(dict):
+    """str.translate table keeping [a-z0-9] and deleting everything else (filled lazily)."""
+    def __missing__(self, codepoint):
+        keep = codepoint if (97 <= codepoint <= 122 or 48 <= codepoint <= 57) else None
+        self[codepoint] = keep
+        return keep
+
+_TITLE_KEY_TABLE = _TitleKeyTable()
+
+def normalize_title(title):
+    """Dedup key for titles: lowercase a-z0-9 only (single C-level translate pass)."""
+    return str(title).lower().translate(_TITLE_KEY_TABLE) if title else ''
+
+@functools.lru_cache(maxsize=10_000)
+def lookup_unpywall(doi):
+    """Process-level memo in front of the (disk-cached) Unpywall DOI lookup."""
+    return Unpywall.doi(doi)
+
+def parse_json_response(r):
+    """Parses a JSON HTTP response body (orjson when available, ~3x faster than stdlib)."""
+    if HAS_ORJSON: return orjson.loads(r.content)
+    return r.json()
+
+# Markdown fence Gemini sometimes wraps around JSON replies
+_JSON_FENCE = re.compile(r'^\s*```(?:json)?|```\s*$')
+
+def clean_json_string(json_str):
+    if '`' not in json_str: return json_str.strip()
+    return _JSON_FENCE.sub('', json_str).strip()
+
 def reconstruct_abstract(inverted_index):
+    """
+    Rebuilds OpenAlex's abstract_inverted_index. Positions are dense, so words are
+    scattered straight into a list sized by the token count (no max() pre-pass);
+    a sparse index falls back to a sort.
+    """
     if not inverted_index: return ""
-    max_index = max(max(pos) for pos in inverted_index.values())
-    words = [""] * (max_index + 1)
-    for word, positions in inverted_index.items():
-        for pos in positions: words[pos] = word
+    words = [None] * sum(map(len, inverted_index.values()))
+    try:
+        for word, positions in inverted_index.items():
+            for pos in positions: words[pos] = word
+    except IndexError:
+        items = sorted((pos, word) for word, positions in inverted_index.items() for pos in positions)
+        return " ".join(word for _, word in items)
+    if None in words: return " ".join(filter(None, words))
     return " ".join(words)
 
 class ResearchCrawler:
-    def __init__(self, topic, keywords, author, publication, date_start, date_end, count, sites, keyword_logic='any', no_llm=False):
+    def __init__(self, topic, keywords, author, publication, date_start, date_end, count, sites, keyword_logic='any', no_llm=False, full_text_audit=False):
         self.keyword_logic = keyword_logic if keyword_logic else 'any'
         self.no_llm = no_llm
+        self.full_text_audit = full_text_audit
         
         self.offsets = {'semantic': 0, 'arxiv': 0}
-        if os.path.exists("research_catalog.csv"):
-            try: os.remove("research_catalog.csv")
+        if os.path.exists(CATALOG_CSV):
+            try: os.remove(CATALOG_CSV)
             except: pass
 
         self.raw_topic = topic
         raw_keywords = [k.strip() for k in keywords.split(',')] if keywords else []
         self.keywords_list = list(raw_keywords)
+        
+        # Precompiled fuzzy keyword patterns (topic stands in when no keywords given)
+        verify_terms = self.keywords_list if self.keywords_list else [self.raw_topic]
+        self._kw_patterns = [(k.replace('"', '').strip().lower(), re.compile(self._build_fuzzy(k), re.IGNORECASE)) for k in verify_terms]
+        self._kw_keys = frozenset(k for k, _ in self._kw_patterns)
+        # One alternation = one linear scan of the blob regardless of keyword count
+        self._kw_union = re.compile("|".join(f"(?:{self._build_fuzzy(k)})" for k in verify_terms), re.IGNORECASE)
+        self._kw_literals = [(k.replace('"', '').strip().lower(), self._literal_variants(k)) for k in verify_terms]
+        
+        # Every literal variant of every keyword in one automaton: O(len(text)) for any K
+        self._aho = None
+        if HAS_AHOCORASICK:
+            self._aho = ahocorasick.Automaton()
+            for clean_k, variants in self._kw_literals:
+                for v in variants: self._aho.add_word(v, clean_k)
+            self._aho.make_automaton()
+        self._contains_keywords = self._contains_all if self.keyword_logic == 'all' else self._contains_any
         self.author = author
         self.publication = publication
         
@@ -84,35 +336,93 @@ class ResearchCrawler:
         self.year_start = int(date_start[:4]) if date_start else 2000
         self.year_end = int(date_end[:4]) if date_end else 2030
         
+        # Precomputed range bounds (None = unbounded) so per-candidate checks are plain compares
+        self._y_lo = self.year_start if date_start else None
+        self._y_hi = self.year_end if date_end else None
+        self._d_lo = self._parse_iso_date(date_start)
+        self._d_hi = self._parse_iso_date(date_end)
+        
         self.final_target_count = int(count)
         # Buffer: Fetch 5x what user asked for to allow for high-quality filtering
         self.target_count = int(self.final_target_count * 5.0) 
         
         self.sites = sites if sites else ['all']
         self.results = []
+        # Accepted papers: exact sets, the only dedup before rows are written (save_results
+        # writes them as-is). They grow with accepted rows only, so target_count bounds them.
         self.seen_dois = set()
         self.seen_titles = set()
-        self.seen_ids = set()
+        # Every candidate seen (unbounded): Bloom-backed, exact within a window of recent keys.
+        # A key that ages out only costs a repeated check; the sets above still reject the paper.
+        self.seen_ids = SeenFilter()
+        self.seen_urls = SeenFilter() # PDF URLs already queued for the Full-Text Audit
+        
+        # Producer/consumer Full-Text Audit: the crawler feeds a bounded queue that
+        # a pool of download workers drains (network bound, overlaps with crawling)
+        self._n_download_workers = int(os.getenv("PDF_WORKERS", "24"))
         
-        self.session = get_session()
+        # unpywall issues its own requests, so its cache has to be installed globally;
+        # get_session() opts the crawler's own sessions back out of that patch.
+        if HAS_REQUESTS_CACHE:
+            requests_cache.install_cache(os.path.join(DATA_DIR, "unpaywall_cache"), **API_CACHE_SETTINGS)
+        
+        # API calls go through the disk cache; PDF downloads never hit it, so they get a
+        # plain session (no cache-key hashing per request). One keep-alive connection per worker.
+        self.session = get_session(os.path.join(DATA_DIR, "openalex_cache"), pool_size=OA_PAGE_WORKERS + 1,
+                                   rate_limits=API_RATE_LIMITS)
+        self.pdf_session = get_session(pool_size=self._n_download_workers)
         self.keyword_logic = keyword_logic if keyword_logic else 'any'
         
+        self.probe_cache = ProbeCache(os.path.join(DATA_DIR, "pdf_probe_cache.sqlite"))
+        self.pdf_pool = ThreadPoolExecutor(max_workers=self._n_download_workers, thread_name_prefix='pdf-audit')
+        self._download_queue = queue.Queue(maxsize=256)
+        self._results_lock = threading.Lock()
+        self._catalog_fh = None # Opened on the first accepted paper
+        self._catalog_writer = None
+        self._catalog_closed = False
+        if self.full_text_audit:
+            for _ in range(self._n_download_workers):
+                self.pdf_pool.submit(self._download_worker)
+        
+        # Shared pool for concurrent OpenAlex pagination; set once the target is met
+        self.oa_pool = ThreadPoolExecutor(max_workers=OA_PAGE_WORKERS, thread_name_prefix='openalex')
+        self._quota_met = threading.Event()
+        
         self.offsets = {'semantic': 0, 'arxiv': 0}
+        
+        # GenAI client is memoized (see get_genai_client)
+        self._api_key = os.getenv("GOOGLE_API_KEY")
+        self._genai_client = None
+        
+        # Batched LLM setup results (filled by expand_all_llm)
+        self._llm_topic = None
+        self._llm_verticals = []
+        self._llm_concept = None
 
     def _normalize_date(self, date_str):
         if not date_str: return f"{self.year_start}/01/01"
-        try:
-            if re.match(r'^\d{4}$', str(date_str)): return f"{date_str}/01/01"
-            return str(date_str).replace('-', '/')
-        except: return f"{self.year_start}/01/01"
+        return format_date(str(date_str))
+
+    @staticmethod
+    def _parse_iso_date(date_str):
+        try: return datetime.date.fromisoformat(date_str) if date_str else None
+        except ValueError: return None
+
+    def _year_in_range(self, year):
+        """Fast path for sources that return an integer publication year (e.g. OpenAlex)."""
+        if not year: return True
+        if self._y_lo is not None and year < self._y_lo: return False
+        if self._y_hi is not None and year > self._y_hi: return False
+        return True
 
     def _is_date_in_range(self, date_str):
+        """Full-date check for sources that return YYYY-MM-DD strings."""
+        if str(date_str).isdigit():
+            return self._year_in_range(int(date_str))
         try:
-            d = datetime.datetime.strptime(self._normalize_date(date_str), "%Y/%m/%d").date()
-            start = datetime.datetime.strptime(self.date_start, "%Y-%m-%d").date() if self.date_start else None
-            end = datetime.datetime.strptime(self.date_end, "%Y-%m-%d").date() if self.date_end else None
-            if start and d < start: return False
-            if end and d > end: return False
+            d = datetime.date.fromisoformat(self._normalize_date(date_str).replace('/', '-'))
+            if self._d_lo and d < self._d_lo: return False
+            if self._d_hi and d > self._d_hi: return False
             return True
         except: return True
 
@@ -125,39 +435,85 @@ class ResearchCrawler:
             return filename
         return 'Pending_Header_Check'
 
-    def _validate_full_text(self, pdf_content, keywords):
+    @staticmethod
+    def _build_fuzzy(keyword):
+        """Fuzzy regex for a keyword: tolerant of spaces/hyphens and plural 's'."""
+        clean_k = keyword.replace('"', '').strip().lower()
+        fuzzy_k = r"s?[\s\-]*".join(re.escape(w) for w in clean_k.split())
+        if "crosstalk" in clean_k:
+            fuzzy_k = fuzzy_k.replace("crosstalk", r"cross[\s\-]*talk")
+        return fuzzy_k + r"s?"
+
+    @staticmethod
+    def _literal_variants(keyword):
+        """Exact spellings of a keyword for MuPDF's native search_for (spaced/hyphenated/joined)."""
+        clean_k = keyword.replace('"', '').strip().lower()
+        words = clean_k.split()
+        variants = {" ".join(words), "-".join(words), "".join(words)}
+        if "crosstalk" in clean_k:
+            variants |= {v.replace("crosstalk", f"cross{sep}talk") for v in list(variants) for sep in (" ", "-")}
+        # search_for matches substrings, so plural forms are already covered
+        return sorted(v for v in variants if v)
+
+    def _keyword_hits(self, text):
+        """
+        Keywords present in text. One Aho-Corasick pass over the literal variants;
+        the fuzzy regexes only run for keywords the automaton did not see.
+        """
+        hits = set()
+        if self._aho is not None:
+            hits = {k for _, k in self._aho.iter(" ".join(text.lower().split()))}
+            if hits >= self._kw_keys: return hits
+        for clean_k, pattern in self._kw_patterns:
+            if clean_k not in hits and pattern.search(text): hits.add(clean_k)
+        return hits
+
+    # --keyword_logic variants; __init__ binds one of them as _contains_keywords
+    def _contains_any(self, text):
+        if self._aho is not None and next(self._aho.iter(" ".join(text.lower().split())), None):
+            return True
+        return self._kw_union.search(text) is not None
+
+    def _contains_all(self, text):
+        return self._keyword_hits(text) >= self._kw_keys
+
+    def _validate_full_text(self, pdf_content):
         """
         Robust Front-Matter Audit:
         Scans first ~2 pages. Ignores 'Movie' annotations to prevent crashes.
         """
+        doc = None
         try:
             # 1. Open Document (from bytes)
             doc = fitz.open(stream=pdf_content, filetype="pdf")
-            text_block = ""
             
-            # 2. Limit to First 2 Pages (Front-Matter)
+            # 2. Limit to First 2 Pages (Front-Matter) - later pages are never parsed
+            # PRP 9.9.5: MEDIABOX_CLIP avoids reading hidden/cropped text
+            flags = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_DEHYPHENATE | fitz.TEXT_MEDIABOX_CLIP
+            # 3. Fast Path: literal search page by page (Aho-Corasick if available, else MuPDF search_for).
+            # Page 2 is only loaded if page 1 misses (MuPDF holds the GIL, so threads
+            # would not help here; the download workers already parallelize across PDFs).
+            pages, textpages = [], []
             for i in range(min(2, doc.page_count)):
                 page = doc.load_page(i)
-                # Use 'text' mode with flags to be robust
-                # PRP 9.9.5: Added MEDIABOX_CLIP to avoid reading hidden/cropped text
-                text_block += page.get_text("text", flags=fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_DEHYPHENATE | fitz.TEXT_MEDIABOX_CLIP) + " "
-            
-            doc.close()
-            
-            # 3. Fuzzy Regex Check
-            blob = text_block.lower()
+                tp = page.get_textpage(flags=flags)
+                if self._aho is not None:
+                    page_text = " ".join(page.get_text("text", textpage=tp).lower().split())
+                    hit = next(self._aho.iter(page_text), None)
+                    if hit:
+                        return True, f"Found match for '{hit[1]}'"
+                else:
+                    for clean_k, variants in self._kw_literals:
+                        if any(page.search_for(v, textpage=tp) for v in variants):
+                            return True, f"Found match for '{clean_k}'"
+                pages.append(page)
+                textpages.append(tp)
             
-            for k in keywords:
-                # Fuzzy Regex Construction
-                clean_k = k.replace('"', '').strip().lower()
-                fuzzy_k = clean_k.replace(" ", r"[\s\-]*")
-                if "crosstalk" in clean_k:
-                    fuzzy_k = fuzzy_k.replace("crosstalk", r"cross[\s\-]*talk")
-                
-                pattern = fuzzy_k + r"s?" 
-                
-                if re.search(pattern, blob):
-                    return True, f"Found match for '{clean_k}'"
+            # 4. Fuzzy Regex Check over extracted words (patterns precompiled in __init__)
+            text_block = " ".join(w[4] for page, tp in zip(pages, textpages) for w in page.get_text("words", textpage=tp))
+            m = self._kw_union.search(text_block)
+            if m:
+                return True, f"Found match for '{m.group(0)}'"
                     
             return False, "No keywords found in Front-Matter"
             
@@ -167,6 +523,8 @@ class ResearchCrawler:
         except Exception as e:
             # Catch general errors
             return False, f"PDF Audit Skipped: {e}"
+        finally:
+            if doc is not None: doc.close()
 
     def _pre_filter(self, title, date, doi):
         if not self._is_date_in_range(date): return False, "Date out of range"
@@ -174,7 +532,7 @@ class ResearchCrawler:
         # Deduplication Check
         if doi and doi in self.seen_dois: return False, "Duplicate DOI"
         
-        norm_title = re.sub(r'[^a-z0-9]', '', str(title).lower())
+        norm_title = normalize_title(title)
         if norm_title in self.seen_titles: return False, "Duplicate Title"
         
         return True, "Passed"
@@ -186,36 +544,105 @@ class ResearchCrawler:
         if not url: 
             if doi:
                 try:
-                    res = Unpywall.doi(doi)
+                    res = lookup_unpywall(doi)
                     if res and res.best_oa_location and res.best_oa_location.url:
                         url = res.best_oa_location.url
                 except: return False, None
         
         if not url: return False, None
+        if self.probe_cache.is_known_bad(url): return False, None
             
         try:
-            check_session = requests.Session()
-            headers = {'User-Agent': 'Mozilla/5.0'}
-            
-            # Stream download to avoid memory issues with huge files
-            r = check_session.get(url, headers=headers, timeout=15)
+            # Content negotiation: DOI resolvers / repositories may answer with the PDF directly
+            # The audit never reads past AUDIT_BYTE_CAP, so servers honouring Range stop there too
+            headers = {'User-Agent': 'Mozilla/5.0', 'Accept': 'application/pdf,*/*;q=0.8',
+                       'Range': f'bytes=0-{AUDIT_BYTE_CAP - 1}'}
             
-            if r.status_code == 200 and b'%PDF' in r.content[:1024]:
-                # --- STRICT FULL TEXT GATE ---
-                # Check directly in memory before saying "Success"
-                verify_terms = self.keywords_list if self.keywords_list else [self.raw_topic]
-                is_valid, reason = self._validate_full_text(r.content, verify_terms)
+            # Reuse the pooled session (keep-alive) and stream so rejects cost one chunk
+            r = self.pdf_session.get(url, headers=headers, timeout=(5, 15), stream=True)
+            try:
+                if r.status_code not in (200, 206):
+                    # Only permanent failures are remembered; 403/429/5xx may recover
+                    if r.status_code in (404, 410): self.probe_cache.mark_bad(url, f"HTTP {r.status_code}")
+                    return False, None
                 
-                if is_valid:
-                    return True, url 
-                else:
-                    # print(f"DEBUG: Rejected {url} (Text Audit Failed: {reason})")
+                # Giant files are rejected outright
+                content_length = r.headers.get('Content-Length', '')
+                if content_length.isdigit() and int(content_length) > MAX_PDF_BYTES:
                     return False, None
+                
+                # The headers alone decide most rejects (like a HEAD, without the extra RTT):
+                # an HTML landing page is never read, other non-PDF types cost 1 KB
+                content_type = r.headers.get('Content-Type', '').lower()
+                if content_type.startswith('text/html'):
+                    self.probe_cache.mark_bad(url, "Not a PDF")
+                    return False, None
+                buf = bytearray()
+                if 'pdf' not in content_type:
+                    buf.extend(r.raw.read(1024, decode_content=True))
+                    if b'%PDF' not in buf:
+                        self.probe_cache.mark_bad(url, "Not a PDF")
+                        return False, None
+                
+                # Front-Matter lives in the first couple of MB; stop reading there
+                deadline = time.monotonic() + PDF_FETCH_DEADLINE
+                for chunk in r.iter_content(65536):
+                    buf.extend(chunk)
+                    # A host trickling bytes would otherwise pin this worker indefinitely
+                    if time.monotonic() > deadline:
+                        return False, None
+                    if len(buf) >= AUDIT_BYTE_CAP:
+                        break
+            finally:
+                r.close()
+            
+            if b'%PDF' not in buf[:1024]:
+                self.probe_cache.mark_bad(url, "Bad PDF magic") # PDF-typed body that is not one
+                return False, None
+            content = bytes(buf)
             
+            # --- STRICT FULL TEXT GATE ---
+            # Check directly in memory before saying "Success"
+            is_valid, reason = self._validate_full_text(content)
+            
+            if is_valid:
+                return True, url 
+            # print(f"DEBUG: Rejected {url} (Text Audit Failed: {reason})")
             return False, None
         except Exception:
             return False, None
 
+    def _download_worker(self):
+        """
+        Consumer side of the Full-Text Audit: downloads + audits queued candidates
+        while the crawler keeps producing, until a None sentinel arrives.
+        """
+        while True:
+            c = self._download_queue.get()
+            try:
+                if c is None: return
+                if self._quota_met.is_set(): continue
+                ok, final_url = self._check_and_download_pdf(c['url'], c['doi'])
+                if ok:
+                    c['final_url'] = final_url
+                    self._add_final_result(c)
+            except Exception:
+                pass
+            finally:
+                self._download_queue.task_done()
+
+    def _stop_download_workers(self):
+        """Drops anything still queued and wakes every worker with a sentinel."""
+        if not self.full_text_audit: return
+        try:
+            while True:
+                self._download_queue.get_nowait()
+                self._download_queue.task_done()
+        except queue.Empty:
+            pass
+        for _ in range(self._n_download_workers):
+            self._download_queue.put(None)
+
     def _process_batch(self, candidates):
         """
         Refactored Validation (PRP 9.9.9.1):
@@ -224,39 +651,50 @@ class ResearchCrawler:
         3. If keyword found OR inferred by search -> Accept.
         4. PDF Download happens LATER (decoupled).
         """
-        # Fuzzy regex for the keyword
-        primary_key = self.keywords_list[0].replace('"', '').lower()
-        fuzzy_pattern = re.sub(r's?\s+', r'[\\s\\-]*', primary_key) + r's?'
-        
         print(f"DEBUG: Processing batch of {len(candidates)} candidates...", flush=True)
+        if not candidates: return
         
+        # 1. Global Deduplication (ids, then Title/DOI so we don't count duplicates).
+        # One plain pass over the page dicts: normalize_title is a single translate call
+        # and the keyword matchers are precompiled, so no DataFrame round-trip is needed.
+        accepted = []
+        page_titles, page_dois = set(), set()
         for c in candidates:
-            # 1. Global Deduplication
-            if c['id'] in self.seen_ids:
-                continue
-            
-            # Check Title/DOI early to ensure we don't count duplicates
-            norm_title = re.sub(r'[^a-z0-9]', '', str(c['title']).lower())
-            if norm_title in self.seen_titles:
-                continue
-            if c['doi'] and c['doi'] in self.seen_dois:
-                continue
-
-            self.seen_ids.add(c['id'])
-            # Note: seen_dois and seen_titles are added in _add_final_result
-            # but we must check them here to skip processing
-            
-            # 2. Construct Audit Blob
-            # We use the pre-parsed 'description' (abstract) and 'keywords' from execute_openalex_query
-            audit_blob = f"{c['title']} {c['description']} {c['keywords']}".lower()
-            
-            # 3. The Logic Check
-            match_found = re.search(fuzzy_pattern, audit_blob)
-            
+            norm_title = normalize_title(c['title'])
+            doi = c['doi']
+            if c['id'] in self.seen_ids or norm_title in self.seen_titles or (doi and doi in self.seen_dois): continue
+            # Same-page duplicates: keep the first (most relevant) copy
+            if norm_title in page_titles: continue
+            page_titles.add(norm_title)
+            if doi and doi in page_dois: continue
+            if doi: page_dois.add(doi)
+            c['norm_title'] = norm_title
+            accepted.append(c)
+        if not accepted: return
+        
+        self.seen_ids.update(c['id'] for c in accepted)
+        # Note: seen_dois and seen_titles are added in _add_final_result
+        
+        # 2./3. Audit Blob + Logic Check (case-insensitive, precompiled)
+        # We use the pre-parsed 'description' (abstract) and 'keywords' from execute_openalex_query
+        for c in accepted:
+            c['match_found'] = self._contains_keywords(f"{c['title']} {c['description']} {c['keywords']}")
             # Set final_url to the source url since we aren't validating it yet
             c['final_url'] = c['url']
-            
-            if match_found:
+        
+        if self.full_text_audit:
+            # Hand off to the download workers; crawling continues meanwhile.
+            # The same PDF under another work id / URL spelling is only fetched once.
+            for c in accepted:
+                if self._quota_met.is_set(): break
+                url_key = normalize_url(c['url'])
+                if url_key in self.seen_urls: continue
+                self.seen_urls.add(url_key)
+                self._download_queue.put(c)
+            return
+        
+        for c in accepted:
+            if c['match_found']:
                 # print(f"   [Accepted] {c['title'][:60]}...")
                 self._add_final_result(c)
             else:
@@ -269,34 +707,96 @@ class ResearchCrawler:
                 break
 
     def _add_final_result(self, c):
-        # Add to tracking sets immediately to prevent race-condition duplicates
-        if c['doi']: self.seen_dois.add(c['doi'])
-        norm_title = re.sub(r'[^a-z0-9]', '', str(c['title']).lower())
-        self.seen_titles.add(norm_title)
-
-        self.results.append({
-            'Title': c['title'].strip(),
-            'Authors': c['authors'],
-            'Original_Filename': self._parse_filename(c['final_url']),
-            'Publication_Date': self._normalize_date(c['date']),
-            'Category': 'Unsorted',
-            'Description': c['description'][:3000] + "..." if c['description'] and len(c['description']) > 3000 else c['description'],
-            'Is_Paywalled': False,
-            'Is_Downloaded': False,
-            'Source_URL': c['final_url'],
-            'DOI': c['doi'],
-            '_Source': c['source_name'],
-            'Citation_Count': c.get('citation_count', 0),
-            'Search_Vertical': c.get('search_vertical', 'Unsorted')
-        })
-        print(f"[Accepted] {c['title'][:60]}...", flush=True)
+        """Records an accepted candidate. Returns False if it lost a race (duplicate / quota met)."""
+        norm_title = c.get('norm_title') or normalize_title(c['title'])
+        # Row strings are built outside the lock; None-safe (OpenAlex may return null fields)
+        title = (c['title'] or '').strip()
+        desc = c['description'] or ''
+        if len(desc) > 3000: desc = desc[:3000] + "..."
+        
+        with self._results_lock:
+            # Download workers accept concurrently: re-check under the lock
+            if self._catalog_closed or len(self.results) >= self.target_count: return False
+            if norm_title in self.seen_titles or (c['doi'] and c['doi'] in self.seen_dois): return False
+            
+            # Add to tracking sets immediately to prevent race-condition duplicates
+            if c['doi']: self.seen_dois.add(c['doi'])
+            self.seen_titles.add(norm_title)
+
+            row = {
+                'Title': title,
+                'Authors': c['authors'],
+                'Original_Filename': self._parse_filename(c['final_url']),
+                'Publication_Date': self._normalize_date(c['date']),
+                'Category': 'Unsorted',
+                'Description': desc,
+                'Is_Paywalled': False,
+                'Is_Downloaded': False,
+                'Source_URL': c['final_url'],
+                'DOI': c['doi'],
+                '_Source': c['source_name'],
+                'Citation_Count': c.get('citation_count', 0),
+                'Search_Vertical': c.get('search_vertical', 'Unsorted')
+            }
+            self.results.append(row)
+            self._append_catalog_row(row)
+            if len(self.results) >= self.target_count:
+                self._quota_met.set()
+        print(f"[Accepted] {title[:60]}...", flush=True)
+        return True
 
     def resolve_concept_id(self, topic_name):
         return self.resolve_entity_id('concepts', topic_name)
 
     # ... (skipping unchanged helper methods) ...
+    def expand_all_llm(self, topic, with_concept=False):
+        """
+        Batched LLM Setup: ONE prompt returns the search verticals and, with
+        with_concept (set it when resolve_concept_id will run), the OpenAlex concept
+        name. Results are cached for get_search_verticals_from_llm and
+        llm_map_to_openalex_entity. A call that got no answer is not repeated by them;
+        returns False if the reply did not parse and the per-task prompt must be used.
+        """
+        prompt = (
+            f"The user is researching '{topic}'. Return strictly a JSON object with these keys:\n"
+            f"1. \"verticals\": a list of the 15 most distinct, high-yield 'Search Verticals' for finding papers in this field. "
+            f"Include Broad Synonyms (e.g., if topic is Spatial Audio -> '3D Audio', 'Immersive Audio') "
+            f"and Core Sub-disciplines (e.g., 'Binaural', 'Ambisonics', 'Wave Field Synthesis').\n"
+        )
+        if with_concept:
+            prompt += (f"2. \"concept\": the single most likely official OpenAlex Concept Name for '{topic}' "
+                       f"(e.g., 'Heart Attack' -> 'Myocardial infarction').\n")
+        prompt += "No explanations."
+        
+        print(f"🧠 Batched LLM Setup for '{topic}'...")
+        resp_text = self._query_llm_with_rotation(prompt)
+        if not resp_text:
+            self._llm_topic = topic # Every model already failed: the per-task prompts would too
+            return False
+        try:
+            data = json.loads(clean_json_string(resp_text))
+            if not isinstance(data, dict): raise ValueError("expected a JSON object")
+        except Exception as e:
+            print(f"   ⚠️ Batched LLM JSON Parse Failed: {e}. Falling back to per-task prompts.")
+            return False
+        
+        self._llm_topic = topic
+        verticals = data.get('verticals')
+        if isinstance(verticals, list):
+            self._llm_verticals = [str(s).strip() for s in verticals if len(str(s).strip()) > 2]
+        concept = data.get('concept')
+        if isinstance(concept, str) and concept.strip():
+            self._llm_concept = concept.strip().replace('"', '').replace("'", "")
+        
+        print(f"   -> Verticals: {len(self._llm_verticals)}, Concept: {self._llm_concept}")
+        return True
+
     def llm_map_to_openalex_entity(self, user_query):
         """Asks Gemini to map colloquial terms to official OpenAlex Concept Names."""
+        if self._llm_concept and self._llm_topic == user_query:
+            print(f"🧠 LLM Semantic Router (cached): '{user_query}' -> '{self._llm_concept}'")
+            return self._llm_concept
+        
         client = self.get_genai_client()
         if not client: return None
         
@@ -401,8 +901,9 @@ class ResearchCrawler:
         # 1. Direct Autocomplete
         try:
             r = self.session.get(f"https://api.openalex.org/autocomplete/{entity_type}", params={"q": query}, timeout=5)
-            if r.status_code == 200 and r.json().get('results'):
-                res = r.json()['results'][0]
+            data = parse_json_response(r) if r.status_code == 200 else {}
+            if data.get('results'):
+                res = data['results'][0]
                 return res['id'].split('/')[-1]
         except: pass
 
@@ -414,7 +915,7 @@ class ResearchCrawler:
                 try:
                     r = self.session.get(f"https://api.openalex.org/{entity_type}", params={"search": semantic_name, "per-page": 5}, timeout=5)
                     if r.status_code == 200:
-                        results = r.json().get('results', [])
+                        results = parse_json_response(r).get('results', [])
                         if results:
                             # Iterate to find exact match or take top
                             for res in results:
@@ -427,82 +928,110 @@ class ResearchCrawler:
 
         return None
 
-    def execute_openalex_query(self, label, filters, search_query, search_vertical="Unsorted"):
-        """Helper to run a specific OpenAlex query strategy with strict quotas."""
+    def _fetch_oa_page(self, filters, search_query, page):
+        """Fetches one OpenAlex results page (JSON dict), or None on failure / quota met."""
+        if self._quota_met.is_set(): return None
+        
+        params = {
+            "filter": filters,
+            "per-page": OA_PER_PAGE,
+            "page": page,
+            "select": OA_SELECT_FIELDS
+        }
+        if search_query: params["search"] = search_query
+        
+        r = self.session.get(OA_WORKS_URL, params=params, timeout=10)
+        if r.status_code != 200: return None
+        return parse_json_response(r)
+
+    def _parse_oa_results(self, results, search_vertical):
+        """Converts raw OpenAlex works into crawler candidates (closed access skipped)."""
+        batch = []
+        for item in results:
+            pdf_url = item.get('open_access', {}).get('oa_url')
+            if not pdf_url: continue # Skip closed access
+            if not self._year_in_range(item.get('publication_year')): continue
+
+            # Generators straight into str.join: no temporary lists per item
+            batch.append({
+                'id': item.get('id'),
+                'title': item.get('title', ""),
+                'authors': ", ".join(a.get("author", {}).get("display_name", "") for a in item.get('authorships') or ()),
+                'date': str(item.get('publication_year', '')),
+                'description': reconstruct_abstract(item.get('abstract_inverted_index')),
+                'doi': item.get('doi', '').replace("https://doi.org/", ""),
+                'url': pdf_url, 
+                'source_name': 'OpenAlex',
+                'keywords': " ".join(k.get('display_name', '') for k in item.get('keywords') or ()),
+                'citation_count': item.get('cited_by_count', 0),
+                'search_vertical': search_vertical
+            })
+        return batch
+
+    def execute_openalex_query(self, label, filters, search_query, search_vertical="Unsorted", first_page=None):
+        """
+        Helper to run a specific OpenAlex query strategy with strict quotas.
+        Page 1 is fetched first to learn the hit count (or taken from the
+        first_page future prefetched by the caller); the following pages are
+        prefetched a few at a time on the shared OpenAlex pool and processed in order.
+        """
         print(f"\n🔎 Executing Strategy: {label}")
         print(f"   Query: search='{search_query}' filter='{filters}'")
         
-        base_url = "https://api.openalex.org/works"
-        current_page = 1
-        per_page = 200
+        # Stop if global target met
+        if self._quota_met.is_set():
+            print(f"✅ Target quota met ({len(self.results)} papers). Stopping.")
+            return
         
-        # Continuous loop until we meet quota OR exhaust results for this strategy
-        while True:
-            # Stop if global target met
-            if len(self.results) >= self.target_count:
-                print(f"✅ Target quota met ({len(self.results)} papers). Stopping.")
-                return
-
-            params = {
-                "filter": filters,
-                "per-page": per_page,
-                "page": current_page,
-                "select": "title,id,publication_year,open_access,authorships,abstract_inverted_index,doi,keywords,concepts,cited_by_count"
-            }
-            if search_query: params["search"] = search_query
-
-            try:
-                r = self.session.get(base_url, params=params, timeout=10)
-                if r.status_code != 200: break
-                results = r.json().get('results', [])
+        futures = []
+        try:
+            data = first_page.result() if first_page is not None else self._fetch_oa_page(filters, search_query, 1)
+            if not data: return
+            total = (data.get('meta') or {}).get('count') or 0
+            n_pages = min(OA_MAX_PAGES, math.ceil(total / OA_PER_PAGE)) # Safety cap (10k papers per strategy)
+            
+            # Sliding prefetch window: at most OA_PAGE_WORKERS pages ahead of the consumer,
+            # so a slow consumer or an early quota stop doesn't pull every page over the wire
+            current_page = 1
+            while True:
+                while len(futures) < min(n_pages - 1, current_page + OA_PAGE_WORKERS - 1):
+                    futures.append(self.oa_pool.submit(self._fetch_oa_page, filters, search_query, len(futures) + 2))
+                
+                results = (data or {}).get('results', [])
                 if not results: 
                     print(f"DEBUG: No more results from OpenAlex (Page {current_page}).")
                     break
                 
                 print(f"DEBUG: Parsing Page {current_page} ({len(results)} raw candidates)...")
-                batch = []
-                
-                for item in results:
-                    pdf_url = item.get('open_access', {}).get('oa_url')
-                    if not pdf_url: continue # Skip closed access
-
-                    abstract_text = reconstruct_abstract(item.get('abstract_inverted_index')) or ""
-                    
-                    keywords_list = [k.get('display_name', '') for k in item.get('keywords', [])]
-                    keywords_text = " ".join(keywords_list)
-                    
-                    batch.append({
-                        'id': item.get('id'),
-                        'title': item.get('title', ""),
-                        'authors': ", ".join([a.get("author", {}).get("display_name", "") for a in item.get('authorships', [])]),
-                        'date': str(item.get('publication_year', '')),
-                        'description': abstract_text,
-                        'doi': item.get('doi', '').replace("https://doi.org/", ""),
-                        'url': pdf_url, 
-                        'source_name': 'OpenAlex',
-                        'keywords': keywords_text,
-                        'citation_count': item.get('cited_by_count', 0),
-                        'search_vertical': search_vertical
-                    })
                 
                 # Trust-Based Validation (PRP 9.9.9.1)
-                self._process_batch(batch)
+                self._process_batch(self._parse_oa_results(results, search_vertical))
                 
+                if self._quota_met.is_set():
+                    print(f"✅ Target quota met ({len(self.results)} papers). Stopping.")
+                    break
+                if current_page - 1 >= len(futures):
+                    break
+                
+                data = futures[current_page - 1].result()
                 current_page += 1
-                if current_page > 50: # Safety cap (10k papers per strategy)
-                    break 
                 
-            except Exception as e: 
-                print(f"Error in strategy {label}: {e}")
-                break
+        except Exception as e: 
+            print(f"Error in strategy {label}: {e}")
+        finally:
+            for fut in futures:
+                fut.cancel()
 
     def get_genai_client(self):
         """Lazy loader for GenAI Client."""
         if self.no_llm: 
             # print("DEBUG: LLM Disabled by user flag.", flush=True)
             return None
-        if not HAS_GENAI or not os.getenv("GOOGLE_API_KEY"): return None
-        return genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+        if not HAS_GENAI or not self._api_key: return None
+        # Built once and reused by every LLM helper
+        if self._genai_client is None:
+            self._genai_client = genai.Client(api_key=self._api_key)
+        return self._genai_client
 
     def get_best_model(self, client):
         """Returns the best available Flash model."""
@@ -517,7 +1046,7 @@ class ResearchCrawler:
         """
         if self.no_llm: return None
 
-        key = os.getenv("GOOGLE_API_KEY")
+        key = self._api_key
         if not key: 
             print("❌ DEBUG: No API Key found in env!")
             return None
@@ -566,6 +1095,9 @@ class ResearchCrawler:
         print("   🧠 Defining Search Verticals with LLM...")
         verticals = [topic]
         
+        if self._llm_topic == topic:
+            return list(self._llm_verticals) or verticals
+        
         prompt = (
             f"The user is researching '{topic}'. Identify the 15 most distinct, high-yield 'Search Verticals' "
             f"for finding papers in this field. \n"
@@ -578,9 +1110,7 @@ class ResearchCrawler:
         resp_text = self._query_llm_with_rotation(prompt)
         if resp_text:
             try:
-                # Clean Markdown
-                cleaned = resp_text.replace("```json", "").replace("```", "").strip()
-                llm_verticals = json.loads(cleaned)
+                llm_verticals = json.loads(clean_json_string(resp_text))
                 
                 if isinstance(llm_verticals, list):
                     # Sanitize
@@ -615,6 +1145,8 @@ class ResearchCrawler:
 
         
         
+        # Batched setup prompt (falls back to the per-task prompt if its reply does not parse)
+        self.expand_all_llm(self.raw_topic)
         verticals = self.get_search_verticals_from_llm(self.raw_topic)
         # Ensure the user's raw topic is always the first loop
         if self.raw_topic not in verticals:
@@ -625,32 +1157,42 @@ class ResearchCrawler:
         print(f"   ✅ Targeted Verticals: {verticals}", flush=True)
 
         # --- STEP 2: EXECUTE LOOP ---
+        filters = ["is_oa:true", "has_doi:true", "type:article|conference-paper"]
+        if self.date_start: filters.append(f"publication_year:>{self.year_start-1}")
+        if self.date_end: filters.append(f"publication_year:<{self.year_end+1}")
+        filter_str = ",".join(filters)
+        
         for keyword_str in self.keywords_list:
             clean_keyword = keyword_str.replace('"', '').strip()
             
+            # Remove redundancy: a vertical equal to the keyword becomes a Base Topic Scan
+            strategies = []
+            other_verticals = []
             for vertical in verticals:
-                # Remove redundancy
-                is_redundant = clean_keyword.lower().strip() == vertical.lower().strip()
-                
-                if is_redundant:
-                    print(f"\n   🔄 Loop: ('{vertical}') [Base Topic Scan]", flush=True)
-                    query = f'("{vertical}")'
+                if clean_keyword.lower().strip() == vertical.lower().strip():
+                    strategies.append((f"('{vertical}') [Base Topic Scan]", f"Vertical: {vertical}", f'("{vertical}")'))
                 else:
-                    print(f"\n   🔄 Loop: ('{clean_keyword}') AND ('{vertical}')", flush=True)
-                    query = f'("{clean_keyword}") AND ("{vertical}")'
-                
-                # Execute standard query 
-                filters = ["is_oa:true", "has_doi:true", "type:article|conference-paper"]
-                if self.date_start: filters.append(f"publication_year:>{self.year_start-1}")
-                if self.date_end: filters.append(f"publication_year:<{self.year_end+1}")
-                filter_str = ",".join(filters)
-                
+                    other_verticals.append(vertical)
+            
+            # Batch the remaining verticals into boolean-OR groups (fewer round trips / 429s)
+            for i in range(0, len(other_verticals), VERTICAL_BATCH_SIZE):
+                group = other_verticals[i:i + VERTICAL_BATCH_SIZE]
+                vertical_part = " OR ".join(f'"{v}"' for v in group)
+                strategies.append((f"('{clean_keyword}') AND ({vertical_part})", f"Verticals: {', '.join(group)}", f'("{clean_keyword}") AND ({vertical_part})'))
+            
+            # Page 1 of the next strategy is prefetched while the current one is processed
+            next_first = self.oa_pool.submit(self._fetch_oa_page, filter_str, strategies[0][2], 1) if strategies else None
+            for i, (loop_desc, label, query) in enumerate(strategies):
+                first_page = next_first
+                next_first = self.oa_pool.submit(self._fetch_oa_page, filter_str, strategies[i + 1][2], 1) if i + 1 < len(strategies) else None
+                print(f"\n   🔄 Loop: {loop_desc}", flush=True)
                 # Pass the CURRENT keyword as the search_vertical origin
-                self.execute_openalex_query(f"Vertical: {vertical}", filter_str, query, search_vertical=clean_keyword)
+                self.execute_openalex_query(label, filter_str, query, search_vertical=clean_keyword, first_page=first_page)
                 
                 # Stop if global target met
                 if len(self.results) >= self.target_count:
                     break
+            if next_first is not None: next_first.cancel()
             
             if len(self.results) >= self.target_count: break
                 
@@ -678,17 +1220,25 @@ class ResearchCrawler:
         # Fallback only
         pass
 
+    def _append_catalog_row(self, row):
+        """Streams one accepted paper to the catalog CSV (caller holds _results_lock)."""
+        if self._catalog_writer is None:
+            self._catalog_fh = open(CATALOG_CSV, 'w', newline='', encoding='utf-8')
+            self._catalog_writer = csv.DictWriter(self._catalog_fh, fieldnames=CATALOG_COLUMNS)
+            self._catalog_writer.writeheader()
+        self._catalog_writer.writerow(row)
+        self._catalog_fh.flush()
+
     def save_results(self):
-        df = pd.DataFrame(self.results)
-        if not df.empty:
-            # Deduplicate by Title and DOI
-            df['norm_title'] = df['Title'].apply(lambda x: re.sub(r'[^a-z0-9]', '', str(x).lower()) if x else '')
-            df = df.drop_duplicates(subset=['norm_title'])
-            df = df.drop_duplicates(subset=['DOI'])
-            df = df.drop(columns=['norm_title'], errors='ignore')
-            
-            df.to_csv("research_catalog.csv", index=False)
-            print(f"\n✅ Saved {len(df)} unique papers to research_catalog.csv")
+        # Rows were written as they were accepted; titles and DOIs are unique
+        # because both are checked under the results lock before insertion.
+        with self._results_lock:
+            self._catalog_closed = True # Late download workers must not reopen (truncate) it
+            if self._catalog_fh is not None:
+                self._catalog_fh.close()
+                self._catalog_fh = self._catalog_writer = None
+        if self.results:
+            print(f"\n✅ Saved {len(self.results)} unique papers to {CATALOG_CSV}")
         else:
             print("\n❌ No results found.")
 
@@ -696,14 +1246,20 @@ class ResearchCrawler:
         try:
             print("🚀 Starting Mission...", flush=True)
             self.search_via_iterative_loop()
+            self._download_queue.join() # Let queued PDF audits finish
             
             # Fallback logic could go here if OpenAlex yields 0 results
             if len(self.results) == 0:
                 print("⚠️ OpenAlex yielded 0 results. Trying Standard Text Search...")
                 self.search_openalex_text_fallback()
+                self._download_queue.join()
 
         except KeyboardInterrupt: print("\nUser Interrupted.")
-        finally: self.save_results()
+        finally:
+            self._stop_download_workers()
+            self.pdf_pool.shutdown(wait=False, cancel_futures=True)
+            self.oa_pool.shutdown(wait=False, cancel_futures=True)
+            self.save_results()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -717,8 +1273,10 @@ if __name__ == "__main__":
     parser.add_argument("--sites")
     parser.add_argument("--keyword_logic", default="any")
     parser.add_argument("--no_llm", action="store_true", help="Disable all LLM/AI features to save quota")
+    parser.add_argument("--full_text_audit", action="store_true", help="Only accept papers whose PDF Front-Matter mentions a keyword")
     args = parser.parse_args()
     
     crawler = ResearchCrawler(args.topic, args.keywords, args.author, args.publication, 
-                              args.date_start, args.date_end, args.count, args.sites, args.keyword_logic, args.no_llm)
+                              args.date_start, args.date_end, args.count, args.sites, args.keyword_logic, args.no_llm,
+                              full_text_audit=args.full_text_audit)
     crawler.run()
\ No newline at end of file
@@ -7,10 +7,20 @@ import time
 import re
 import argparse
 import shutil
-from collections import Counter
 import sys
 import typing_extensions
 import random  # Required for sampling
+import hashlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# Optional: local TF-IDF + KMeans clustering when the LLM is off or fails
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.cluster import MiniBatchKMeans
+    HAS_SKLEARN = True
+except ImportError:
+    HAS_SKLEARN = False
 
 # Load environment variables (Force override to prevent stale shell keys)
 load_dotenv(override=True)
@@ -27,26 +37,56 @@ class PaperClassification(typing_extensions.TypedDict):
 class TaxonomyResponse(typing_extensions.TypedDict):
     assignments: list[PaperClassification]
 
+# Titles that are proceedings furniture, not papers
+NON_PAPER_TITLES = frozenset({'audio', 'introduction', 'front matter', 'back matter', 'index'})
+
 # --- UTILS ---
+class _FolderCharTable(dict):
+    """str.translate table keeping alphanumerics (Unicode-aware), space, '_' and '-' (filled lazily)."""
+    def __missing__(self, codepoint):
+        ch = chr(codepoint)
+        keep = codepoint if (ch.isalnum() or ch in ' _-') else None
+        self[codepoint] = keep
+        return keep
+
+_FOLDER_CHAR_TABLE = _FolderCharTable()
+
+@functools.lru_cache(maxsize=512)
 def sanitize_folder_name(name):
     """Sanitizes category names for file system compatibility."""
     # Allow slash for internal path logic, but we handle that before calling this usually.
     # If this receives "Category/Subcat", we want to sanitize parts.
-    clean = "".join([c if c.isalnum() or c in (' ', '_', '-') else '' for c in name])
-    return clean.strip().replace(' ', '_')
+    # Category names repeat across papers, hence the memo.
+    return name.translate(_FOLDER_CHAR_TABLE).strip().replace(' ', '_')
+
+# Markdown code fence around a JSON reply: leading ```json / ``` and trailing ```
+_JSON_FENCE = re.compile(r'^\s*```(?:json)?|```\s*$')
 
 def clean_json_string(json_str):
-    json_str = json_str.strip()
-    if json_str.startswith("```json"):
-        json_str = json_str[7:]
-    if json_str.startswith("```"):
-        json_str = json_str[3:]
-    if json_str.endswith("```"):
-        json_str = json_str[:-3]
-    return json_str.strip()
+    # Schema-constrained replies are usually bare JSON: skip the regex entirely
+    if '`' not in json_str: return json_str.strip()
+    return _JSON_FENCE.sub('', json_str).strip()
+
+MODEL_CACHE_TTL = 86400 # Discovered model name is reused from disk for a day
 
+@functools.lru_cache(maxsize=1)
 def get_best_model():
-    """Dynamically finds the best available Flash model for large context."""
+    """
+    Dynamically finds the best available Flash model for large context.
+    GEMINI_MODEL overrides discovery; otherwise the list_models() result is cached on disk
+    (like the response cache, skipped entirely under --no_cache).
+    """
+    env_model = os.getenv("GEMINI_MODEL")
+    if env_model: return env_model
+    
+    cache_path = os.path.join(LLM_CACHE_DIR, "best_model.json")
+    try:
+        if LLM_CACHE_ENABLED and time.time() - os.path.getmtime(cache_path) < MODEL_CACHE_TTL:
+            with open(cache_path, encoding='utf-8') as f:
+                return json.load(f)['model']
+    except (OSError, ValueError, KeyError):
+        pass
+    
     try:
         available_models = []
         for m in genai.list_models():
@@ -58,10 +98,157 @@ def get_best_model():
         
         available_models.sort()
         best_model = available_models[-1] # Usually the latest version
+        if LLM_CACHE_ENABLED:
+            os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'model': best_model}, f)
         return best_model
     except:
         return 'models/gemini-1.5-flash'
 
+# --- LLM RESPONSE CACHE ---
+# Identical prompts (same papers, same model) are answered from disk on reruns.
+LLM_CACHE_DIR = os.path.join(os.path.dirname(__file__), "../data/llm_cache")
+LLM_CACHE_TTL = 7 * 86400  # seconds
+LLM_CACHE_ENABLED = True   # --no_cache turns it off
+
+def generate_json(model, prompt, response_schema):
+    """
+    model.generate_content() with JSON output, parsed. Responses are cached by
+    SHA-256 of (model name, schema, prompt); models without a name are never cached.
+    """
+    # Prompts are written as indented f-strings; the indentation is pure input tokens
+    prompt = "\n".join(line.strip() for line in prompt.strip().splitlines())
+    
+    model_name = getattr(model, 'model_name', None)
+    cache_path = None
+    if LLM_CACHE_ENABLED and isinstance(model_name, str):
+        key = hashlib.sha256(f"{model_name}\n{response_schema.__name__}\n{prompt}".encode('utf-8')).hexdigest()
+        cache_path = os.path.join(LLM_CACHE_DIR, f"{key}.json")
+        try:
+            if time.time() - os.path.getmtime(cache_path) < LLM_CACHE_TTL:
+                with open(cache_path, encoding='utf-8') as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    response = model.generate_content(
+        prompt,
+        generation_config=genai.GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=response_schema
+        )
+    )
+    data = json.loads(clean_json_string(response.text))
+
+    if cache_path:
+        # Write-then-rename so a crash never leaves a truncated entry behind
+        os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, cache_path)
+    return data
+
+# Near-duplicate reruns (same papers, reworded topic / a few new hits) reuse the root
+# taxonomy when the title sets overlap enough; identical categories then make the
+# assignment prompts identical too, so those batches hit the exact cache above.
+TAXONOMY_INDEX_PATH = os.path.join(LLM_CACHE_DIR, "root_taxonomies.json")
+TAXONOMY_REUSE_JACCARD = 0.9
+TAXONOMY_INDEX_MAX = 200
+
+def _title_keys(titles):
+    return {re.sub(r'[^a-z0-9]', '', str(t).lower()) for t in titles}
+
+def _load_taxonomy_index():
+    try:
+        with open(TAXONOMY_INDEX_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+def find_similar_taxonomy(titles):
+    """Root categories of a cached run whose title set is >= TAXONOMY_REUSE_JACCARD similar, else None."""
+    if not LLM_CACHE_ENABLED: return None
+    keys = _title_keys(titles)
+    best, best_sim = None, 0.0
+    for entry in _load_taxonomy_index():
+        other = set(entry['titles'])
+        sim = len(keys & other) / len(keys | other) if keys or other else 0.0
+        if sim > best_sim: best, best_sim = entry, sim
+    if best and best_sim >= TAXONOMY_REUSE_JACCARD:
+        print(f"      ♻️ Reusing cached taxonomy ({best_sim:.0%} title overlap).")
+        return best['categories']
+    return None
+
+def remember_taxonomy(titles, categories):
+    if not LLM_CACHE_ENABLED: return
+    index = _load_taxonomy_index()
+    index.append({'titles': sorted(_title_keys(titles)), 'categories': categories, 'ts': int(time.time())})
+    os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{TAXONOMY_INDEX_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index[-TAXONOMY_INDEX_MAX:], f)
+    os.replace(tmp_path, TAXONOMY_INDEX_PATH)
+
+# Assignment batches are independent prompts; a few run at once (stays under Gemini RPM)
+LLM_WORKERS = 4
+
+def run_llm_batches(classify_batch, batches):
+    """Runs classify_batch(batch_idx, batch) -> {id: category} concurrently; merged in batch order."""
+    merged = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(LLM_WORKERS, len(batches)))) as pool:
+        for assignments in pool.map(classify_batch, range(len(batches)), batches):
+            merged.update(assignments)
+    return merged
+
+# Retry waits: the server's own retry hint when a 429 carries one, else exponential + jitter
+LLM_RETRY_ATTEMPTS = 5
+LLM_RETRY_BASE = 2    # seconds; doubles per attempt (2+4+8+16 = 30s before giving up)
+LLM_RETRY_MAX_WAIT = 60
+_RE_RETRY_HINT = re.compile(r'retry_delay\s*\{\s*seconds:\s*(\d+)|retry in ([\d.]+)s', re.IGNORECASE)
+
+def retry_wait(attempt, error):
+    """Seconds to sleep before retry #attempt+1 (attempt is 0-based)."""
+    hint = getattr(error, 'retry_delay', None) # google.api_core ResourceExhausted, when present
+    delay = getattr(hint, 'seconds', hint) if hint is not None else None
+    if not isinstance(delay, (int, float)):
+        m = _RE_RETRY_HINT.search(str(error))
+        delay = float(m.group(1) or m.group(2)) if m else LLM_RETRY_BASE * 2 ** attempt
+    return min(LLM_RETRY_MAX_WAIT, delay) + random.uniform(0, 1)
+
+LOCAL_CLUSTER_MIN_PAPERS = 15 # Same gate as the LLM path's "too small for hierarchy"
+
+def local_cluster_categories(texts):
+    """
+    Offline fallback: TF-IDF + MiniBatchKMeans over title/description texts.
+    Returns one label per text (cluster named by its top-3 terms), or None if
+    scikit-learn is missing or there are too few papers to cluster.
+    """
+    if not HAS_SKLEARN or len(texts) < LOCAL_CLUSTER_MIN_PAPERS: return None
+    try:
+        vectorizer = TfidfVectorizer(max_features=2000, stop_words='english')
+        X = vectorizer.fit_transform(texts)
+        k = max(2, min(8, len(texts) // 15))
+        km = MiniBatchKMeans(n_clusters=k, batch_size=256, n_init=3, random_state=0).fit(X)
+        terms = vectorizer.get_feature_names_out()
+        names = [" ".join(terms[i].title() for i in centroid.argsort()[::-1][:3]) for centroid in km.cluster_centers_]
+        print(f"   🧮 Local clustering: {k} groups {sorted(set(names))}")
+        return [names[label] for label in km.labels_]
+    except ValueError as e: # e.g. nothing but stop words
+        print(f"   ⚠️ Local clustering failed: {e}")
+        return None
+
+CATALOG_DATE_FORMAT = "%Y/%m/%d" # What the crawler writes (format_date in stage 1)
+
+def parse_catalog_dates(dates):
+    """Parses with the catalog's fixed format; only the odd other spellings fall back to inference."""
+    parsed = pd.to_datetime(dates, format=CATALOG_DATE_FORMAT, errors='coerce')
+    misses = parsed.isna() & dates.notna()
+    if misses.any():
+        parsed[misses] = pd.to_datetime(dates[misses], format='mixed', errors='coerce')
+    return parsed
+
 # --- CORE LOGIC ---
 
 def generate_root_taxonomy(model, titles, vertical, max_cats=12):
@@ -71,12 +258,15 @@ def generate_root_taxonomy(model, titles, vertical, max_cats=12):
     SAFETY FIX: Uses 'Representative Sampling' to avoid Token Limits.
     Scanning 200 random titles is statistically sufficient to design the taxonomy.
     """
+    cached = find_similar_taxonomy(titles)
+    if cached: return cached
     
     # SAFETY: Cap the input to 200 titles to prevent Context/Token errors.
     if len(titles) > 200:
         print(f"      Sampling 200 representative titles from {len(titles)} to design taxonomy...", flush=True)
-        # Use random.sample to get a diverse spread
-        titles_subset = random.sample(titles, 200)
+        # Use random.sample to get a diverse spread (seeded per vertical so reruns
+        # build the same prompt and can be served from the LLM cache)
+        titles_subset = random.Random(vertical).sample(titles, 200)
     else:
         titles_subset = titles
 
@@ -100,14 +290,7 @@ def generate_root_taxonomy(model, titles, vertical, max_cats=12):
     """
     
     try:
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                response_mime_type="application/json",
-                response_schema=TaxonomyList
-            )
-        )
-        data = json.loads(clean_json_string(response.text))
+        data = generate_json(model, prompt, TaxonomyList)
         cats = data.get("broad_categories", [])
         
         # Fallback if model gets lazy and returns too few
@@ -116,6 +299,7 @@ def generate_root_taxonomy(model, titles, vertical, max_cats=12):
              return [f"{vertical} Theory", f"{vertical} Systems", f"{vertical} Evaluation", f"{vertical} Applications"]
 
         print(f"      ✅ Defined {len(cats)} Root Domains: {cats}")
+        remember_taxonomy(titles, cats)
         return cats
     except Exception as e:
         print(f"      ⚠️ Taxonomy Gen Failed: {e}. Using Default.")
@@ -126,12 +310,10 @@ def cluster_subfolder(model, papers_payload, parent_category):
     print(f"      ⚡ Refining Dense Folder: '{parent_category}' ({len(papers_payload)} papers)...")
     
     BATCH_SIZE = 50
-    num_batches = (len(papers_payload) + BATCH_SIZE - 1) // BATCH_SIZE
-    all_assignments = {}
+    batches = [papers_payload[i:i + BATCH_SIZE] for i in range(0, len(papers_payload), BATCH_SIZE)]
+    num_batches = len(batches)
 
-    for batch_idx in range(num_batches):
-        batch = papers_payload[batch_idx * BATCH_SIZE : (batch_idx + 1) * BATCH_SIZE]
-        
+    def classify_batch(batch_idx, batch):
         prompt = f"""
         You are a Technical Specialist. 
         The folder "{parent_category}" has become too large.
@@ -144,29 +326,22 @@ def cluster_subfolder(model, papers_payload, parent_category):
         5. If a paper doesn't fit a specific theme, assign it to "General {parent_category}".
         
         Input Papers:
-        {json.dumps(batch, indent=2)}
+        {json.dumps(batch, separators=(',', ':'))}
         """
         
         # Retry logic for sub-batches
-        for attempt in range(3):
+        for attempt in range(LLM_RETRY_ATTEMPTS):
             try:
-                response = model.generate_content(
-                    prompt,
-                    generation_config=genai.GenerationConfig(
-                        response_mime_type="application/json",
-                        response_schema=TaxonomyResponse
-                    )
-                )
-                data = json.loads(clean_json_string(response.text))
-                batch_assignments = {item['id']: item['category_name'] for item in data.get('assignments', [])}
-                all_assignments.update(batch_assignments)
-                break # Success
+                data = generate_json(model, prompt, TaxonomyResponse)
+                return {item['id']: item['category_name'] for item in data.get('assignments', [])}
             except Exception as e:
-                if attempt == 2:
+                if attempt == LLM_RETRY_ATTEMPTS - 1:
                     print(f"      ⚠️ Sub-clustering batch {batch_idx+1} failed: {e}")
-                time.sleep(1)
+                else:
+                    time.sleep(retry_wait(attempt, e))
+        return {}
 
-    return all_assignments
+    return run_llm_batches(classify_batch, batches)
 
 def cluster_and_categorize(topic, sort_method="Most Relevant", limit=100, no_llm=False, use_keywords=False, fast_mode=False):
     print("=== Phase 3: The Smart Architect (Recursive Clustering) ===", flush=True)
@@ -175,6 +350,15 @@ def cluster_and_categorize(topic, sort_method="Most Relevant", limit=100, no_llm
         print("⚡ Fast Mode Enabled: Skipping AI Clustering.", flush=True)
         no_llm = True
 
+    # Model discovery (network) runs while the CSV is loaded and filtered
+    api_key = os.getenv("GOOGLE_API_KEY")
+    model_future = None
+    if api_key and not no_llm:
+        genai.configure(api_key=api_key)
+        model_pool = ThreadPoolExecutor(max_workers=1)
+        model_future = model_pool.submit(get_best_model)
+        model_pool.shutdown(wait=False)
+
     # --- CSV LOAD ---
     csv_filename = "research_catalog.csv"
     data_dir_csv = os.path.join(os.path.dirname(__file__), "../data", csv_filename)
@@ -190,32 +374,29 @@ def cluster_and_categorize(topic, sort_method="Most Relevant", limit=100, no_llm
         print(f"Error reading CSV: {e}")
         return
     
-    # Pre-Processing
-    df = df[df['Title'].str.len() > 15] 
-    df = df[~df['Title'].str.lower().isin(['audio', 'introduction', 'front matter', 'index'])]
+    # Pre-Processing: one combined mask (too short, or a front/back-matter heading)
+    titles = df['Title']
+    df = df[titles.str.len().gt(15) & ~titles.str.lower().isin(NON_PAPER_TITLES)]
     
     # Sorting
-    if sort_method == "Date: Newest":
-        df['Publication_Date'] = pd.to_datetime(df['Publication_Date'], errors='coerce')
-        df = df.sort_values(by='Publication_Date', ascending=False)
-    elif sort_method == "Date: Oldest":
-        df['Publication_Date'] = pd.to_datetime(df['Publication_Date'], errors='coerce')
-        df = df.sort_values(by='Publication_Date', ascending=True)
+    if sort_method in ("Date: Newest", "Date: Oldest"):
+        df['Publication_Date'] = parse_catalog_dates(df['Publication_Date'])
+        df = df.sort_values(by='Publication_Date', ascending=(sort_method == "Date: Oldest"), kind='stable')
 
     # Limit
     process_limit = max(limit * 2, limit + 50)
     if len(df) > process_limit:
         df = df.head(process_limit)
 
-    api_key = os.getenv("GOOGLE_API_KEY")
+    # Paper id = DOI when present, else Title (column-wise, reused by both phases below)
+    paper_ids = df['DOI'].where(df['DOI'].notna() & df['DOI'].astype(str).str.strip().ne(''), df['Title'])
+
     taxonomy_map = {} # Maps DOI -> "Category" OR "Category/Subcategory"
-    ai_success = False
 
     if not api_key or no_llm:
         print("⚠️ AI Disabled or Key Missing.")
     else:
-        genai.configure(api_key=api_key)
-        model_name = get_best_model()
+        model_name = model_future.result()
         model = genai.GenerativeModel(model_name)
         
         if 'Search_Vertical' not in df.columns: df['Search_Vertical'] = 'Unsorted'
@@ -229,20 +410,13 @@ def cluster_and_categorize(topic, sort_method="Most Relevant", limit=100, no_llm
             print(f"\n   -> Analyzing Vertical: '{vertical}' ({len(v_df)} papers)...", flush=True)
 
             # 1. Prepare Data
-            papers_payload = []
-            titles_only = []
-            for index, row in v_df.iterrows():
-                pid = row['DOI'] if pd.notna(row['DOI']) and str(row['DOI']).strip() else row['Title']
-                desc = str(row['Description'])
-                if len(desc) < 50: desc = f"Title: {row['Title']}"
-                
-                payload_item = {
-                    "id": pid,
-                    "title": row['Title'],
-                    "description": desc[:500] # Cap context
-                }
-                papers_payload.append(payload_item)
-                titles_only.append(row['Title'])
+            titles_only = v_df['Title'].tolist()
+            descs = v_df['Description'].astype(str)
+            descs = descs.where(descs.str.len() >= 50, "Title: " + v_df['Title'].astype(str))
+            papers_payload = [
+                {"id": pid, "title": title, "description": desc}
+                for pid, title, desc in zip(paper_ids[v_df.index], titles_only, descs.str[:500]) # Cap context
+            ]
 
             # 2. Logic Gate: Small vs Large
             if len(v_df) < 15:
@@ -250,6 +424,14 @@ def cluster_and_categorize(topic, sort_method="Most Relevant", limit=100, no_llm
                 for p in papers_payload: taxonomy_map[p['id']] = f"{vertical} Overview"
                 continue
 
+            # Identical title+description rows (editions, re-ingested proceedings) are
+            # classified once; duplicates inherit the representative's category below
+            unique_payload, aliases = {}, {} # aliases: duplicate id -> representative id
+            for p in papers_payload:
+                rep = unique_payload.setdefault((p['title'], p['description']), p)
+                if rep is not p: aliases[p['id']] = rep['id']
+            papers_payload = list(unique_payload.values())
+
             # 3. PHASE 1: Generate Master Taxonomy (The Architect)
             # This ensures we don't have > 12 folders at the top level
             root_categories = generate_root_taxonomy(model, titles_only, vertical, max_cats=12)
@@ -257,58 +439,48 @@ def cluster_and_categorize(topic, sort_method="Most Relevant", limit=100, no_llm
             # 4. PHASE 2: Assign Papers to Root Categories (The Librarian)
             # We must batch this if > 50 papers to avoid output token limits
             BATCH_SIZE = 50
-            num_batches = (len(papers_payload) + BATCH_SIZE - 1) // BATCH_SIZE
+            batches = [papers_payload[i:i + BATCH_SIZE] for i in range(0, len(papers_payload), BATCH_SIZE)]
+            num_batches = len(batches)
             
-            broad_assignments = {} # PID -> Category
-            
-            for batch_idx in range(num_batches):
-                batch = papers_payload[batch_idx * BATCH_SIZE : (batch_idx + 1) * BATCH_SIZE]
-                
+            def classify_batch(batch_idx, batch):
                 prompt = f"""
                 You are organizing papers into these SPECIFIC broad categories:
-                {json.dumps(root_categories)}
+                {json.dumps(root_categories, separators=(',', ':'))}
                 
                 Input: {len(batch)} papers.
                 Task: Assign every paper to exactly one of the categories above.
                 If strictly unrelated, assign "DISCARD".
                 
                 Papers:
-                {json.dumps(batch, indent=2)}
+                {json.dumps(batch, separators=(',', ':'))}
                 """
                 
                 # Retry logic
-                for attempt in range(3):
+                for attempt in range(LLM_RETRY_ATTEMPTS):
                     try:
-                        resp = model.generate_content(
-                            prompt,
-                            generation_config=genai.GenerationConfig(
-                                response_mime_type="application/json",
-                                response_schema=TaxonomyResponse
-                            )
-                        )
-                        data = json.loads(clean_json_string(resp.text))
-                        for item in data.get('assignments', []):
-                            broad_assignments[item['id']] = item['category_name']
+                        data = generate_json(model, prompt, TaxonomyResponse)
                         print(f"      Batch {batch_idx+1}/{num_batches} sorted.")
-                        break
+                        return {item['id']: item['category_name'] for item in data.get('assignments', [])}
                     except Exception as e:
-                        if attempt == 2: print(f"      ❌ Batch failed: {e}")
-                        time.sleep(2)
+                        if attempt == LLM_RETRY_ATTEMPTS - 1: print(f"      ❌ Batch failed: {e}")
+                        else: time.sleep(retry_wait(attempt, e))
+                return {}
+            
+            broad_assignments = run_llm_batches(classify_batch, batches) # PID -> Category
             
             # 5. PHASE 3: Density Check & Recursion (The Specialist)
             # Check which categories are too fat
-            cat_counts = Counter(broad_assignments.values())
+            # One hashed grouping pass: category -> its paper IDs (count = len)
+            broad = pd.Series(list(broad_assignments.values()), index=list(broad_assignments), dtype=object)
             
-            for category, count in cat_counts.items():
+            for category, category_pids in broad.index.groupby(broad).items():
                 if category == "DISCARD": continue
                 
-                # Get all papers in this category
-                category_pids = [pid for pid, cat in broad_assignments.items() if cat == category]
-                
                 # THRESHOLD: If > 15 papers, create Sub-Folders
-                if count > 15:
+                if len(category_pids) > 15:
                     # Filter payload for just these papers
-                    sub_payload = [p for p in papers_payload if p['id'] in category_pids]
+                    pid_set = set(category_pids)
+                    sub_payload = [p for p in papers_payload if p['id'] in pid_set]
                     
                     # Call Sub-cluster routine
                     sub_map = cluster_subfolder(model, sub_payload, category)
@@ -323,7 +495,8 @@ def cluster_and_categorize(topic, sort_method="Most Relevant", limit=100, no_llm
                     for pid in category_pids:
                         taxonomy_map[pid] = category
             
-            ai_success = True
+            for pid, rep in aliases.items():
+                if rep in taxonomy_map: taxonomy_map[pid] = taxonomy_map[rep]
 
     # --- WRITING TO DISK ---
     
@@ -331,51 +504,54 @@ def cluster_and_categorize(topic, sort_method="Most Relevant", limit=100, no_llm
     topic_sanitized = sanitize_folder_name(topic)
     base_library_root = os.path.join("./ScholarStack", topic_sanitized)
     
-    rows_to_drop = []
-    
-    # Add new columns if they don't exist
-    if 'Category' not in df.columns: df['Category'] = None
-    if 'Directory_Path' not in df.columns: df['Directory_Path'] = None
-
-    for index, row in df.iterrows():
-        pid = row['DOI'] if pd.notna(row['DOI']) and str(row['DOI']).strip() else row['Title']
-        
-        # Get AI Category (or misc)
-        full_category_path = taxonomy_map.get(pid, "Miscellaneous") if ai_success else "Miscellaneous"
-        
-        if full_category_path == "DISCARD":
-            rows_to_drop.append(index)
-            continue
-            
+    # Category per paper, then folder paths resolved once per distinct category / vertical
+    full_paths = paper_ids.map(taxonomy_map).astype(object)
+    unassigned = full_paths.isna()
+    if unassigned.any():
+        # No LLM, or every call for these papers failed: cluster them locally
+        # unless Fast Mode asked for no clustering at all
+        if taxonomy_map or (api_key and not no_llm):
+            print(f"⚠️ LLM left {int(unassigned.sum())} papers unassigned. Clustering them locally.")
+        rest = df[unassigned]
+        texts = (rest['Title'].astype(str) + " " + rest['Description'].fillna('').astype(str)).tolist()
+        local_labels = None if fast_mode else local_cluster_categories(texts)
+        full_paths[unassigned] = local_labels or "Miscellaneous"
+
+    discard = full_paths.eq("DISCARD")
+    rows_to_drop = int(discard.sum())
+    df, full_paths = df[~discard].copy(), full_paths[~discard]
+
+    def rel_path(full_category_path):
         # Parse Parent/Child
         if "/" in full_category_path:
             parts = full_category_path.split("/")
-            parent = sanitize_folder_name(parts[0])
-            child = sanitize_folder_name(parts[1])
-            final_rel_path = os.path.join(parent, child)
-        else:
-            final_rel_path = sanitize_folder_name(full_category_path)
+            return os.path.join(sanitize_folder_name(parts[0]), sanitize_folder_name(parts[1]))
+        return sanitize_folder_name(full_category_path)
 
+    def vertical_root(raw_vertical):
         # Handle Vertical (Keyword) Folder
-        current_root = base_library_root
-        if use_keywords:
-            raw_vertical = row.get('Search_Vertical', 'Unsorted')
-            safe_vertical = sanitize_folder_name(str(raw_vertical))
-            if safe_vertical.lower() != topic_sanitized.lower():
-                current_root = os.path.join(base_library_root, safe_vertical)
-            else:
-                current_root = os.path.join(base_library_root, "_General")
-
-        dir_path = os.path.join(current_root, final_rel_path)
+        safe_vertical = sanitize_folder_name(str(raw_vertical))
+        if safe_vertical.lower() != topic_sanitized.lower():
+            return os.path.join(base_library_root, safe_vertical)
+        return os.path.join(base_library_root, "_General")
+
+    rel_paths = full_paths.map({cat: rel_path(cat) for cat in full_paths.unique()})
+    if use_keywords:
+        verticals = df['Search_Vertical'] if 'Search_Vertical' in df.columns else pd.Series('Unsorted', index=df.index)
+        roots = verticals.map({v: vertical_root(v) for v in verticals.unique()})
+    else:
+        roots = pd.Series(base_library_root, index=df.index)
+    dir_paths = [os.path.join(root, rel) for root, rel in zip(roots, rel_paths)]
+
+    for dir_path in dict.fromkeys(dir_paths):
         os.makedirs(dir_path, exist_ok=True)
-        
-        df.at[index, 'Category'] = full_category_path
-        df.at[index, 'Directory_Path'] = dir_path
+
+    df['Category'] = full_paths
+    df['Directory_Path'] = dir_paths
 
     # Cleanup
     if rows_to_drop:
-        df = df.drop(rows_to_drop)
-        print(f"Discarded {len(rows_to_drop)} papers.")
+        print(f"Discarded {rows_to_drop} papers.")
 
     if len(df) > limit:
          df = df.head(limit)
@@ -396,6 +572,8 @@ if __name__ == "__main__":
     parser.add_argument("--no_llm", action="store_true")
     parser.add_argument("--use_keywords", action="store_true")
     parser.add_argument("--fast_mode", action="store_true")
+    parser.add_argument("--no_cache", action="store_true", help="Always query the LLM (skip data/llm_cache)")
     args = parser.parse_args()
+    if args.no_cache: LLM_CACHE_ENABLED = False
     
     cluster_and_categorize(args.topic, args.sort, args.limit, args.no_llm, args.use_keywords, args.fast_mode)
\ No newline at end of file
@@ -1,5 +1,7 @@
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 import os
@@ -7,20 +9,124 @@ import re
 import csv
 import json
 import shutil
+import zipfile
 from urllib.parse import urlparse, unquote
 from tqdm import tqdm
 import time
+import math
+import threading
 import random
-from bs4 import BeautifulSoup
-from googlesearch import search
+import sqlite3
+import functools
+import html
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from bs4 import BeautifulSoup, SoupStrainer
+try:
+    import requests_cache
+    HAS_REQUESTS_CACHE = True
+except ImportError:
+    HAS_REQUESTS_CACHE = False
+
+# Optional: C-backed HTML parser for landing-page scraping
+try:
+    import lxml
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+HTML_PARSER = 'lxml' if HAS_LXML else 'html.parser'
+# The scraper only reads <meta> and <a>; everything else is skipped while parsing
+_LANDING_TAGS = SoupStrainer(['meta', 'a'])
 from ddgs import DDGS
 from unpywall import Unpywall
 from unpywall.utils import UnpywallCredentials
 UnpywallCredentials('vv@scholar-stack.com') # Using user email logic or placeholder
 
+# Papers are fetched concurrently; the work is network-bound (threads wait on sockets)
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "16"))
+PROBE_WORKERS = 8 # Landing-page scrapes of the DDG fallback, on top of the download threads
+
+# One pooled session for all lookups and downloads: keep-alive sockets (and TLS
+# handshakes) are reused across papers instead of reconnecting per request.
+# 429s are not retried here; the callers back off through their RateLimiter.
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=DOWNLOAD_WORKERS + PROBE_WORKERS,
+                       max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503], raise_on_status=False))
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+# --- LOOKUP CACHE ---
+# Results of the PDF-finding fallbacks (Unpaywall, S2 search, page scrape, DDG) persist
+# across runs, so a rerun of a topic does not repeat the same external queries.
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../data")
+LOOKUP_CACHE_PATH = os.path.join(DATA_DIR, "lookup_cache.sqlite")
+LOOKUP_CACHE_TTL = 7 * 86400  # Found a PDF URL
+LOOKUP_MISS_TTL = 86400       # Found nothing (may have been a transient failure)
+LOOKUP_CACHE_ENABLED = True   # --no_cache turns it off
+
+# Batch metadata lookups (S2 / OpenAlex by DOI) go through an HTTP cache as well;
+# PDF bodies never do (files already on disk are skipped before any request).
+# Built on first use, so importing the module creates no cache file.
+@functools.lru_cache(maxsize=1)
+def get_api_session():
+    if not HAS_REQUESTS_CACHE: return SESSION
+    os.makedirs(DATA_DIR, exist_ok=True)
+    session = requests_cache.CachedSession(os.path.join(DATA_DIR, "download_api_cache"), backend='sqlite',
+                                           expire_after=86400, allowable_methods=('GET', 'POST'), allowable_codes=(200,))
+    session.mount('http://', _adapter)
+    session.mount('https://', _adapter)
+    return session
+
+def api_session():
+    return get_api_session() if LOOKUP_CACHE_ENABLED else SESSION
+
+class LookupCache:
+    """(source, key) -> JSON result store shared by the download workers."""
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS lookup (source TEXT, key TEXT, result TEXT, ts INTEGER, PRIMARY KEY (source, key))")
+        self._db.commit()
+
+    def get(self, source, key):
+        """(True, result) on a fresh hit, else (False, None)."""
+        with self._lock:
+            row = self._db.execute("SELECT result, ts FROM lookup WHERE source = ? AND key = ?", (source, key)).fetchone()
+        if row is None: return False, None
+        result = json.loads(row[0])
+        ttl = LOOKUP_CACHE_TTL if result else LOOKUP_MISS_TTL
+        if time.time() - row[1] > ttl: return False, None
+        return True, result
+
+    def put(self, source, key, result):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO lookup VALUES (?, ?, ?, ?)", (source, key, json.dumps(result), int(time.time())))
+            self._db.commit()
+
+@functools.lru_cache(maxsize=1)
+def get_lookup_cache():
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return LookupCache(LOOKUP_CACHE_PATH)
+
+def cached_lookup(func):
+    """Serves func(key) from the lookup cache (keyed by function name + argument) before going to the network."""
+    @functools.wraps(func)
+    def wrapper(key):
+        if not LOOKUP_CACHE_ENABLED or not key or str(key) == 'nan': return func(key)
+        cache = get_lookup_cache()
+        hit, result = cache.get(func.__name__, str(key))
+        if hit: return result
+        result = func(key)
+        cache.put(func.__name__, str(key), result)
+        return result
+    return wrapper
+
+# Characters Windows/macOS reject in filenames
+_RE_UNSAFE_FILENAME = re.compile(r'[<>:"/\\|?*]')
+
 def sanitize_filename(name):
     """Sanitizes filenames to be OS-safe."""
-    return re.sub(r'[<>:"/\\|?*]', '', name).strip()
+    return _RE_UNSAFE_FILENAME.sub('', name).strip()
 
 def generate_filename(paper, format_option="Title"):
     """
@@ -65,66 +171,62 @@ def generate_filename(paper, format_option="Title"):
         
     return base + ".pdf"
 
+_RE_CD_FILENAME = re.compile(r'filename=["\']?([^"\';]+)["\']?')
+
 def get_filename_from_cd(cd):
     """Get filename from content-disposition header."""
     if not cd:
         return None
-    fname = re.findall(r'filename=["\']?([^"\';]+)["\']?', cd)
+    fname = _RE_CD_FILENAME.findall(cd)
     if len(fname) == 0:
         return None
     return fname[0].strip()
 
 def create_markdown_catalog(papers, topic, output_path, search_params=None):
-    """Generates a human-readable Markdown catalog."""
-    with open(output_path, "w", encoding="utf-8") as f:
-        downloaded_count = sum(1 for p in papers if p.get('is_downloaded'))
-        f.write(f"# Library Catalog: {topic}\n\n")
+    """Generates a human-readable Markdown catalog (assembled in memory, written once)."""
+    downloaded_count = sum(1 for p in papers if p.get('is_downloaded'))
+    lines = [f"# Library Catalog: {topic}\n\n"]
+    
+    if search_params:
+        lines.append("## Search Settings\n")
+        lines.extend(f"- **{k}:** {v}\n" for k, v in search_params.items() if v)
+        lines.append("\n")
         
-        if search_params:
-            f.write("## Search Settings\n")
-            for k, v in search_params.items():
-                if v: f.write(f"- **{k}:** {v}\n")
-            f.write("\n")
-            
-        f.write(f"**Total Papers Listed:** {len(papers)}  \n")
-        f.write(f"**Total Papers Downloaded:** {downloaded_count}  \n")
-        f.write(f"**Generated:** {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')}\n\n")
+    lines.append(f"**Total Papers Listed:** {len(papers)}  \n")
+    lines.append(f"**Total Papers Downloaded:** {downloaded_count}  \n")
+    lines.append(f"**Generated:** {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')}\n\n")
+    
+    # Group by Category: sort so each category's papers are contiguous
+    papers_sorted = sorted(papers, key=lambda x: (x.get('category', 'Uncategorized'), x.get('title', '')))
+    
+    current_cat = None
+    for paper in papers_sorted:
+        cat = paper.get('category', 'Uncategorized')
+        if cat != current_cat:
+            lines.append(f"## {cat}\n\n| Title | First Author | Year | Journal | Citations | Link |\n|---|---|---|---|---|---|\n")
+            current_cat = cat
         
-        # Sort keys for grouping? Assuming papers list is already sorted or we group here.
-        # But 'papers' is a list of dicts. We need to group by Category.
-        # Simple approach: Convert back to DF for easy grouping or use itertools.groupby
-        # Let's stick to simple iteration if already sorted, or just re-sort.
-        papers_sorted = sorted(papers, key=lambda x: (x.get('category', 'Uncategorized'), x.get('title', '')))
+        title = paper.get('title', 'Unknown Title').replace('|', '-') # Escape pipes
         
-        current_cat = None
-        for paper in papers_sorted:
-            cat = paper.get('category', 'Uncategorized')
-            if cat != current_cat:
-                f.write(f"## {cat}\n\n")
-                f.write("| Title | First Author | Year | Journal | Citations | Link |\n")
-                f.write("|---|---|---|---|---|---|\n")
-                current_cat = cat
-            
-            title = paper.get('title', 'Unknown Title').replace('|', '-') # Escape pipes
-            
-            authors_list = paper.get('authors', [])
-            if not authors_list:
-                first_author = "Unknown"
-            else:
-                first_author = authors_list[0]
-                if len(authors_list) > 1:
-                    first_author += " et al."
-            
-            year = str(paper.get('year', ''))
-            journal = str(paper.get('journal', ''))
-            citations = str(paper.get('citation_count', ''))
-            if citations == 'None': citations = ''
-            
-            url = paper.get('url', '')
-            link = f"[Source]({url})" if url else "N/A"
-            
-            f.write(f"| {title} | {first_author} | {year} | {journal} | {citations} | {link} |\n")
-        f.write("\n")
+        authors_list = paper.get('authors', [])
+        if not authors_list:
+            first_author = "Unknown"
+        else:
+            first_author = authors_list[0]
+            if len(authors_list) > 1:
+                first_author += " et al."
+        
+        citations = str(paper.get('citation_count', ''))
+        if citations == 'None': citations = ''
+        
+        url = paper.get('url', '')
+        link = f"[Source]({url})" if url else "N/A"
+        
+        lines.append(f"| {title} | {first_author} | {paper.get('year', '')} | {paper.get('journal', '')} | {citations} | {link} |\n")
+    lines.append("\n")
+    
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("".join(lines))
 
 def create_csv_catalog(papers, output_path):
     """Generates a strictly quoted CSV catalog."""
@@ -169,6 +271,8 @@ def create_ris_catalog(papers, output_path):
             
             f.write("ER  - \n\n")
 
+_RE_PARENTHESIZED = re.compile(r'\(.*?\)')
+
 def generate_citation_key(paper, existing_keys):
     """Generates a unique BibTeX citation key: [FirstAuthor][Year][FirstTitleWord]"""
     # 1. First Author
@@ -179,7 +283,7 @@ def generate_citation_key(paper, existing_keys):
         # Let's try to be smart. Remove weird chars.
         first_auth_full = authors[0]
         # remove content in parens if any
-        first_auth_full = re.sub(r'\(.*?\)', '', first_auth_full).strip()
+        first_auth_full = _RE_PARENTHESIZED.sub('', first_auth_full).strip()
         # Take last word as surname (rough heuristic)
         surname = first_auth_full.split()[-1] if first_auth_full else "Unknown"
         surname = "".join(filter(str.isalnum, surname))
@@ -235,9 +339,18 @@ def create_bibtex_catalog(papers, output_path):
                  f.write(f"  abstract = {{{abs_text}}}\n")
             f.write("}\n\n")
 
+class _FolderCharTable(dict):
+    """str.translate table keeping alphanumerics (Unicode-aware), space, '_' and '-' (filled lazily)."""
+    def __missing__(self, codepoint):
+        ch = chr(codepoint)
+        keep = codepoint if (ch.isalnum() or ch in ' _-') else None
+        self[codepoint] = keep
+        return keep
+
+_FOLDER_CHAR_TABLE = _FolderCharTable()
+
 def sanitize_folder_name(name):
-    clean = "".join([c if c.isalnum() or c in (' ', '_', '-') else '' for c in name])
-    return clean.strip().replace(' ', '_')
+    return name.translate(_FOLDER_CHAR_TABLE).strip().replace(' ', '_')
 
 # ... (skipping unchanged helpers) ...
 
@@ -364,13 +477,16 @@ def download_library(limit=None, sort_by="Most Relevant", **kwargs):
 
 # ABORTING MASSIVE REPLACEMENT. Splitting into smaller, safer edits.
 
-def sanitize_folder_name(name):
-    clean = "".join([c if c.isalnum() or c in (' ', '_', '-') else '' for c in name])
-    return clean.strip().replace(' ', '_')
-
 def get_pdf_from_unpywall(doi):
     """Fallback: Try to find a direct PDF link via Unpywall."""
     if not doi or str(doi) == 'nan': return None
+    # DOIs are case-insensitive: one normalized key per paper for both cache layers
+    return _unpywall_lookup(str(doi).strip().lower())
+
+# In-process memo over the on-disk cache: S2 hits re-ask Unpywall for DOIs already tried
+@functools.lru_cache(maxsize=4096)
+@cached_lookup
+def _unpywall_lookup(doi):
     try:
         # 1. Unpywall requires a LIST of DOIs
         res = Unpywall.doi([doi])
@@ -390,20 +506,35 @@ def get_pdf_from_unpywall(doi):
         pass
     return None
 
+# <meta ... name="citation_pdf_url" ... content="..."> (attributes in either order)
+_RE_META_TAG = re.compile(rb'<meta\b[^>]*\bname\s*=\s*["\']?citation_pdf_url\b[^>]*>', re.IGNORECASE)
+_RE_META_CONTENT = re.compile(rb'\bcontent\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE)
+
+def find_meta_pdf_url(page_bytes):
+    """citation_pdf_url straight from the raw HTML bytes, or None."""
+    tag = _RE_META_TAG.search(page_bytes)
+    content = tag and _RE_META_CONTENT.search(tag.group(0))
+    if not content: return None
+    value = (content.group(1) or content.group(2) or b'').decode('utf-8', 'replace').strip()
+    return html.unescape(value) or None
+
+@cached_lookup
 def get_pdf_from_meta_tags(url):
     """Scrapes landing page for <meta name='citation_pdf_url'> OR visible PDF links."""
     if not url or url.lower().endswith('.pdf'): return None
     try:
         headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36'}
-        r = requests.get(url, headers=headers, timeout=5)
+        r = SESSION.get(url, headers=headers, timeout=5)
         
         if r.status_code == 200:
-            soup = BeautifulSoup(r.content, 'html.parser')
-            
-            # 1. Standard Google Scholar Meta Tag
-            meta_pdf = soup.find('meta', attrs={'name': 'citation_pdf_url'})
-            if meta_pdf and meta_pdf.get('content'):
-                candidate = meta_pdf['content']
+            # 1. Standard Google Scholar Meta Tag: a byte-level regex finds it without
+            # building the DOM; the parse below is only needed when it is missing
+            candidate = find_meta_pdf_url(r.content)
+            if not candidate:
+                soup = BeautifulSoup(r.content, HTML_PARSER, parse_only=_LANDING_TAGS)
+                meta_pdf = soup.find('meta', attrs={'name': 'citation_pdf_url'})
+                candidate = meta_pdf.get('content') if meta_pdf else None
+            if candidate:
                 if 'localhost' in candidate and 'tu-berlin' in url:
                     candidate = candidate.replace('http://localhost:4000', 'https://depositonce.tu-berlin.de')
                 print(f"   [Meta Scraper] Found PDF (Meta): {candidate}")
@@ -442,6 +573,36 @@ def get_pdf_from_meta_tags(url):
         pass
     return None
 
+class RateLimiter:
+    """Token bucket shared by the download threads: acquire() blocks until a request may go out."""
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def backoff(self, seconds):
+        """Server pushed back (429): every thread waits ~seconds before the next request."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+# Semantic Scholar allows ~1 req/s without an API key; pacing avoids 429 stalls
+S2_LIMITER = RateLimiter(1.0)
+
+@cached_lookup
 def attempt_secondary_search(title):
     """Fallback: Search Semantic Scholar for alternative PDF links or DOIs."""
     if not title or len(str(title)) < 10: return None
@@ -451,7 +612,8 @@ def attempt_secondary_search(title):
         try:
             # 1. Search Semantic Scholar
             params = {'query': title, 'limit': 1, 'fields': 'title,openAccessPdf,externalIds,url'}
-            r = requests.get('https://api.semanticscholar.org/graph/v1/paper/search', params=params, timeout=5)
+            S2_LIMITER.acquire()
+            r = SESSION.get('https://api.semanticscholar.org/graph/v1/paper/search', params=params, timeout=5)
             
             if r.status_code == 200:
                 data = r.json()
@@ -494,7 +656,7 @@ def attempt_secondary_search(title):
             elif r.status_code == 429:
                  wait = (attempt + 1) * 5
                  print(f"   [Secondary Search] Rate Limit Hit. Waiting {wait}s...")
-                 time.sleep(wait)
+                 S2_LIMITER.backoff(wait) # Throttles every thread, not just this one
                  continue
                  
         except: pass
@@ -503,11 +665,105 @@ def attempt_secondary_search(title):
 
     return None
 
+S2_BATCH_URL = 'https://api.semanticscholar.org/graph/v1/paper/batch'
+S2_BATCH_SIZE = 500 # API maximum ids per POST
+
+def resolve_s2_batch(dois):
+    """
+    Looks up many DOIs on Semantic Scholar in a few batch POSTs (up to 500 ids each).
+    Returns {doi.lower(): pdf_url or None} for every DOI S2 knows, so the per-title
+    Secondary Search can be skipped for those papers.
+    """
+    dois = list(dict.fromkeys(str(d).strip() for d in dois if d and str(d) != 'nan'))
+    found = {}
+    for i in range(0, len(dois), S2_BATCH_SIZE):
+        batch = dois[i:i + S2_BATCH_SIZE]
+        for attempt in range(2):
+            try:
+                S2_LIMITER.acquire()
+                r = api_session().post(S2_BATCH_URL, params={'fields': 'openAccessPdf,externalIds'},
+                                       json={'ids': [f"DOI:{d}" for d in batch]}, timeout=30)
+                if r.status_code == 429:
+                    wait = (attempt + 1) * 5
+                    print(f"   [S2 Batch] Rate Limit Hit. Waiting {wait}s...")
+                    S2_LIMITER.backoff(wait)
+                    continue
+                if r.status_code == 200:
+                    # Results come back in request order, None for unknown ids
+                    for doi, paper in zip(batch, r.json()):
+                        if not paper: continue
+                        pdf_url = (paper.get('openAccessPdf') or {}).get('url')
+                        if pdf_url and 'arxiv.org/abs' in pdf_url:
+                            pdf_url = pdf_url.replace('/abs/', '/pdf/') + ".pdf"
+                        arxiv_id = (paper.get('externalIds') or {}).get('ArXiv')
+                        if not pdf_url and arxiv_id:
+                            pdf_url = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
+                        found[doi.lower()] = pdf_url
+            except Exception as e:
+                print(f"   [S2 Batch] Error: {e}")
+            break
+    print(f"   [S2 Batch] Resolved {len(found)}/{len(dois)} DOIs in {math.ceil(len(dois) / S2_BATCH_SIZE)} request(s).")
+    return found
+
+OA_WORKS_URL = "https://api.openalex.org/works"
+OA_BATCH_SIZE = 50 # DOIs per OR-filter request
+OA_MAILTO = os.getenv("OPENALEX_MAILTO", "vv@scholar-stack.com") # Polite pool
+
+def resolve_openalex_batch(dois):
+    """
+    Looks up many DOIs on OpenAlex (50 per request, OR-filter). Returns
+    {doi.lower(): pdf_url or None}: the best OA location's direct PDF link, else
+    the first location that has one. These are the pdf_url fields the search
+    stage does not use (it keeps open_access.oa_url, often a landing page).
+    """
+    dois = list(dict.fromkeys(str(d).strip().lower() for d in dois if d and str(d) != 'nan'))
+    found = {}
+    for i in range(0, len(dois), OA_BATCH_SIZE):
+        batch = dois[i:i + OA_BATCH_SIZE]
+        try:
+            r = api_session().get(OA_WORKS_URL, params={'filter': 'doi:' + '|'.join(batch), 'per-page': OA_BATCH_SIZE,
+                                                        'select': 'doi,best_oa_location,locations', 'mailto': OA_MAILTO}, timeout=30)
+            if r.status_code != 200: continue
+            for work in r.json().get('results', []):
+                doi = (work.get('doi') or '').lower().replace('https://doi.org/', '')
+                if not doi: continue
+                locations = [work.get('best_oa_location') or {}] + (work.get('locations') or [])
+                found[doi] = next((loc['pdf_url'] for loc in locations if loc and loc.get('pdf_url')), None)
+        except Exception as e:
+            print(f"   [OpenAlex Batch] Error: {e}")
+    print(f"   [OpenAlex Batch] Resolved {sum(1 for u in found.values() if u)}/{len(dois)} DOIs to PDF links.")
+    return found
+
+# Candidate landing-page scrapes for one paper run side by side. The pool is created on
+# first use and shut down at the end of download_library (a later run makes a new one).
+_probe_pool = None
+_probe_pool_lock = threading.Lock()
+
+def get_probe_pool():
+    global _probe_pool
+    with _probe_pool_lock:
+        if _probe_pool is None:
+            _probe_pool = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix='probe')
+        return _probe_pool
+
+def shutdown_probe_pool():
+    global _probe_pool
+    with _probe_pool_lock:
+        pool, _probe_pool = _probe_pool, None
+    if pool is not None: pool.shutdown(cancel_futures=True)
+
+def is_scrapable_landing_page(url):
+    """A search hit worth scraping for a PDF link (not a PDF/arXiv link itself, not a known dead end)."""
+    if not url or url.lower().endswith('.pdf') or 'arxiv.org/abs' in url: return False
+    return not ('books.google' in url or 'scholar.google' in url or 'researchgate.net' in url)
+
+@cached_lookup
 def attempt_ddg_fallback(title):
     """Fallback: Use DuckDuckGo to find PDF candidates (Direct or via Landing Page)."""
     print(f"   [DDG Rescue] Hunting for '{title[:30]}...'")
     candidates = []
     seen_urls = set()
+    scrapes = {} # landing page URL -> pending get_pdf_from_meta_tags future
     
     try:
         with DDGS() as ddgs:
@@ -528,6 +784,10 @@ def attempt_ddg_fallback(title):
             # 2. Relaxed Search & Scrape
             query = f'{title} pdf'
             results = list(ddgs.text(query, max_results=5))
+            # Landing pages are scraped concurrently, but only as many ahead as could still be
+            # used (3 candidates max); results are consumed in rank order
+            landing_pages = [url for url in (r.get('href', '') for r in results)
+                             if is_scrapable_landing_page(url) and url not in seen_urls]
             for r in results:
                 url = r.get('href', '')
                 if url in seen_urls: continue
@@ -549,13 +809,17 @@ def attempt_ddg_fallback(title):
                     continue
                     
                 # C. Landing Page Scrape (The "Human Click" Strategy)
-                if 'books.google' in url or 'scholar.google' in url or 'researchgate.net' in url: continue
+                if url not in landing_pages: continue
                 
                 # Only scrape if we don't have enough candidates yet
                 if len(candidates) >= 3: break
                 
+                start = landing_pages.index(url)
+                for page in landing_pages[start:start + 3 - len(candidates)]:
+                    if page not in scrapes: scrapes[page] = get_probe_pool().submit(get_pdf_from_meta_tags, page)
+                
                 print(f"   [DDG Rescue] Checking candidate page: {url}")
-                scraped_pdf = get_pdf_from_meta_tags(url)
+                scraped_pdf = scrapes[url].result()
                 if scraped_pdf and scraped_pdf not in seen_urls:
                     print(f"   [DDG Rescue] Extracted PDF from page: {scraped_pdf}")
                     candidates.append(scraped_pdf)
@@ -563,72 +827,16 @@ def attempt_ddg_fallback(title):
 
     except Exception as e:
         print(f"   [DDG Rescue] Error: {e}")
+    finally:
+        for future in scrapes.values(): future.cancel() # Read-ahead no longer needed
         
     return candidates  # Returns list
 
-def attempt_google_fallback(title):
-    """Last Resort: Mimic User's 'Google It' behavior."""
-    print(f"   [Google Rescue] Hunting for '{title[:30]}...'")
-    try:
-        # Strict search first
-        query = f'"{title}" filetype:pdf'
-        results = search(query, num_results=3, advanced=True)
-        for r in results:
-            if r.url.endswith('.pdf'):
-                print(f"   [Google Rescue] Found PDF: {r.url}")
-                return r.url
-        
-        # Looser search: Check HEAD of top results
-        query = f'{title} pdf'
-        print(f"   [Google Rescue] Deep Scanning for: {query}")
-        
-        # 1. Fetch Candidates (up to 7)
-        candidates = []
-        try:
-             results = search(query, num_results=7, advanced=True)
-             for r in results:
-                 candidates.append(r.url)
-        except: pass
-        
-        for url in candidates:
-            # A. Known Patterns
-            if 'arxiv.org/abs' in url:
-                pdf_url = url.replace('/abs/', '/pdf/') + ".pdf"
-                print(f"   [Google Rescue] Found ArXiv: {pdf_url}")
-                return pdf_url
-            
-            # B. Extension Check
-            if url.lower().endswith('.pdf'):
-                print(f"   [Google Rescue] Found PDF (Ext): {url}")
-                return url
-                
-            # C. HEAD CHECK (The "Nuclear" Option)
-            # Checks if a URL *serves* a PDF even if it doesn't look like one
-            try:
-                h_headers = {'User-Agent': random.choice([
-                    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                ])}
-                # Quick HEAD request (3s timeout)
-                h = requests.head(url, headers=h_headers, timeout=3, allow_redirects=True)
-                
-                # Check Content-Type
-                ct = h.headers.get('Content-Type', '').lower()
-                if 'application/pdf' in ct:
-                    print(f"   [Google Rescue] Found PDF (HEAD): {url}")
-                    return url
-                    
-                # Content-Disposition check
-                cd = h.headers.get('Content-Disposition', '').lower()
-                if 'pdf' in cd and 'attachment' in cd:
-                     print(f"   [Google Rescue] Found PDF (Disp): {url}")
-                     return url
-                     
-            except: pass
-            
-    except Exception as e:
-        pass
-    return None
+# Hosts with broken certificate chains (IOA, TU-Berlin): the only ones fetched unverified.
+# Extend by hand; a TLS failure anywhere else is treated as a failed download.
+SSL_INSECURE_HOSTS = {'depositonce.tu-berlin.de'}
+LANDING_PAGE_MAX_BYTES = 50000 # Declared text/html bodies under this are never PDFs
+DOWNLOAD_BUFFER_BYTES = 1 << 20
 
 def download_file(url, local_path):
     """Robust download with retries and header validation."""
@@ -642,6 +850,8 @@ def download_file(url, local_path):
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/115.0'
     ]
     
+    verify = urlparse(url).hostname not in SSL_INSECURE_HOSTS
+    
     # 1. Try Direct Method
     for attempt in range(2):
         try:
@@ -661,38 +871,69 @@ def download_file(url, local_path):
                 headers['Sec-Fetch-Site'] = 'none'
                 headers['Sec-Fetch-User'] = '?1'
 
-            # SSL Verify=False for older academic repos (IOA, TU-Berlin sometimes have cert issues)
+            # Certificates are verified except on hosts known to have broken chains
             # Timeout reduced to 10s to fail fast
-            r = requests.get(url, headers=headers, stream=True, timeout=10, verify=False)
-            
-            if r.status_code == 403:
-                time.sleep(2) # Backoff for 403
-                continue
-                
-            if r.status_code == 200:
-                # Content-Type Check (Permissive)
-                ct = r.headers.get('Content-Type', '').lower()
-                if 'text/html' in ct and len(r.content) < 50000:
-                    # Likely a landing page, not a PDF
-                    pass 
-                else:
-                    with open(local_path, 'wb') as f:
-                        for chunk in r.iter_content(chunk_size=8192):
-                            f.write(chunk)
+            # Streamed response: the with-block hands the socket back to the pool on every path
+            with SESSION.get(url, headers=headers, stream=True, timeout=10, verify=verify) as r:
+                if r.status_code in (403, 429):
+                    time.sleep(2) # Backoff, then one more try with another User-Agent
+                    continue
                     
-                    # Validate Magic Bytes
-                    if os.path.exists(local_path):
-                        with open(local_path, 'rb') as f:
-                            head = f.read(1024)
-                        if b'%PDF' in head:
-                            return True
-                        else:
-                            os.remove(local_path) # Corrupt
+                if r.status_code == 200:
+                    # Small HTML by its headers alone: a landing page, no body read at all
+                    ct = r.headers.get('Content-Type', '').lower()
+                    length = r.headers.get('Content-Length', '')
+                    if 'text/html' in ct and length.isdigit() and int(length) < LANDING_PAGE_MAX_BYTES:
+                        return False
+                    
+                    # Validate Magic Bytes on the first 1KB of the stream, before anything
+                    # touches the disk (Content-Type is unreliable: landing pages and
+                    # mislabelled PDFs both exist, so the bytes decide)
+                    r.raw.decode_content = True # gzip/deflate transfer encodings, as iter_content would
+                    head = b''
+                    while len(head) < 1024:
+                        chunk = r.raw.read(1024 - len(head))
+                        if not chunk: break
+                        head += chunk
+                    if b'%PDF' in head:
+                        # Rest of the body copied in 1MB blocks in C, not an 8KB Python loop.
+                        # Written beside the target first: a cut-off transfer must not
+                        # leave a truncated PDF that the resume check would accept.
+                        part_path = local_path + '.part'
+                        try:
+                            with open(part_path, 'wb', buffering=DOWNLOAD_BUFFER_BYTES) as f:
+                                f.write(head)
+                                shutil.copyfileobj(r.raw, f, DOWNLOAD_BUFFER_BYTES)
+                            os.replace(part_path, local_path)
+                        except BaseException:
+                            if os.path.exists(part_path): os.remove(part_path)
+                            raise
+                        return True
+            return False # 404, landing page, ...: a second try would get the same answer
         except Exception: 
-            pass
+            return False
             
     return False
 
+# Already-compressed payloads: deflating them again costs CPU and saves ~nothing
+STORED_EXTENSIONS = ('.pdf', '.zip', '.png', '.jpg', '.jpeg')
+
+def zip_library(zip_path, root_dir):
+    """
+    Same layout as shutil.make_archive(base, 'zip', root_dir), but PDFs (and other
+    compressed files) are stored as-is; only the text catalogs get deflated.
+    """
+    with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for dirpath, dirnames, filenames in os.walk(root_dir):
+            arc_dir = os.path.normpath(os.path.relpath(dirpath, root_dir))
+            for name in sorted(dirnames):
+                zf.write(os.path.join(dirpath, name), os.path.join(arc_dir, name))
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if not os.path.isfile(path): continue
+                stored = name.lower().endswith(STORED_EXTENSIONS)
+                zf.write(path, os.path.join(arc_dir, name), compress_type=zipfile.ZIP_STORED if stored else None)
+
 def download_library(limit=None, sort_by="Most Relevant", filename_format="Title", fast_mode=False, **kwargs):
     print("=== Phase 4: The Physical Librarian (V9: Robust) ===")
     
@@ -745,6 +986,15 @@ def download_library(limit=None, sort_by="Most Relevant", filename_format="Title
             df = df.sort_values(by='Citation_Count', ascending=True)
     # else: "Most Relevant" -> assumes input order is relevance (from API)
 
+    # Same paper listed twice (punctuation/case variants of one title): download it once,
+    # and before trimming so duplicates don't use up the limit. Letters of every script
+    # stay in the key (\W is Unicode-aware), so non-Latin titles never collapse to their digits.
+    title_keys = df['Title'].astype(str).str.casefold().str.replace(r'[\W_]', '', regex=True)
+    duplicate = title_keys.duplicated() & title_keys.ne('')
+    if duplicate.any():
+        df = df[~duplicate]
+        print(f"Skipped {int(duplicate.sum())} duplicate title(s).")
+
     # 2. Trim
     if limit:
         original_count = len(df)
@@ -758,6 +1008,12 @@ def download_library(limit=None, sort_by="Most Relevant", filename_format="Title
 
     print(f"Found {len(df)} papers. Starting download process (Parallel Execution)...")
 
+    # Batched OpenAlex / S2 lookups up front replace search requests per failed paper
+    s2_pdf_urls, oa_pdf_urls = {}, {}
+    if not fast_mode and 'DOI' in df.columns:
+        s2_pdf_urls = resolve_s2_batch(df['DOI'].dropna())
+        oa_pdf_urls = resolve_openalex_batch(df['DOI'].dropna())
+
     # --- Helper Function for Threading ---
     def process_paper_wrapper(args):
         index, row = args
@@ -803,14 +1059,24 @@ def download_library(limit=None, sort_by="Most Relevant", filename_format="Title
                      return (index, True, pdf_url, filename, False)
 
         if not fast_mode:
-            # 4. Secondary Search (S2)
-            new_url = attempt_secondary_search(title)
+            doi_key = str(doi).strip().lower() if doi else None
+            # 4. OpenAlex PDF locations (batch-resolved by DOI)
+            new_url = oa_pdf_urls.get(doi_key)
+            if new_url and new_url != url:
+                if download_file(new_url, local_path):
+                     return (index, True, new_url, filename, False)
+
+            # 5. Secondary Search (S2): batch-resolved by DOI, per-title search otherwise
+            if doi_key in s2_pdf_urls:
+                new_url = s2_pdf_urls[doi_key]
+            else:
+                new_url = attempt_secondary_search(title)
             if new_url:
                 if download_file(new_url, local_path):
                      return (index, True, new_url, filename, False)
 
         if not fast_mode:
-            # 5. DDG Rescue (Multi-Candidate)
+            # 6. DDG Rescue (Multi-Candidate)
             candidates = attempt_ddg_fallback(title)
             if candidates:
                 for cand_url in candidates:
@@ -820,13 +1086,24 @@ def download_library(limit=None, sort_by="Most Relevant", filename_format="Title
         return (index, False, None, None, True)
 
     # --- Execute Parallel Loop ---
-    from concurrent.futures import ThreadPoolExecutor, as_completed
+    # Plain dicts per paper: workers read them, the loop below updates them in place
+    records = df.to_dict('records')
+    
+    def already_downloaded(rec):
+        """Finished in an earlier run: flagged in the CSV and its file is still on disk."""
+        folder, fname = rec.get('Directory_Path'), rec.get('Original_Filename')
+        if rec.get('Is_Downloaded') != True or not isinstance(folder, str) or not isinstance(fname, str): return False
+        path = os.path.join(folder, fname)
+        return os.path.exists(path) and os.path.getsize(path) > 1024
     
-    # Prepare arguments
-    tasks = [(i, row) for i, row in df.iterrows()]
+    # Resumed runs only schedule the papers still missing (and tqdm counts just those)
+    tasks = [(i, rec) for i, rec in enumerate(records) if not already_downloaded(rec)]
+    if len(tasks) < len(records):
+        success_count += len(records) - len(tasks)
+        print(f"Skipping {len(records) - len(tasks)} papers already downloaded.")
     
-    # Max Workers = 4 to balance speed and stability
-    with ThreadPoolExecutor(max_workers=4) as executor:
+    # Results are applied to df here on the main thread only, so no lock is needed
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix='download') as executor:
         future_to_paper = {executor.submit(process_paper_wrapper, task): task for task in tasks}
         
         processed_count = 0
@@ -836,39 +1113,41 @@ def download_library(limit=None, sort_by="Most Relevant", filename_format="Title
             try:
                 idx, success, final_url, fname, paywalled = future.result()
                 
+                rec = records[idx]
                 if success:
-                    df.at[idx, 'Is_Downloaded'] = True
-                    df.at[idx, 'Source_URL'] = final_url
-                    df.at[idx, 'Original_Filename'] = fname
-                    df.at[idx, 'Is_Paywalled'] = False
+                    rec['Is_Downloaded'] = True
+                    rec['Source_URL'] = final_url
+                    rec['Original_Filename'] = fname
+                    rec['Is_Paywalled'] = False
                     success_count += 1
                 else:
-                    df.at[idx, 'Is_Downloaded'] = False
-                    df.at[idx, 'Is_Paywalled'] = True
+                    rec['Is_Downloaded'] = False
+                    rec['Is_Paywalled'] = True
                     fail_count += 1
                 
                 processed_count += 1
                 
                 # Checkpoint: Save progress every N papers
                 if processed_count % checkpoint_interval == 0:
-                    df.to_csv(csv_path, index=False)
+                    pd.DataFrame(records).to_csv(csv_path, index=False)
                     
             except Exception as e:
                 print(f"Error processing future: {e}")
                 
-        # Final save after loop
+        # Final save after loop: one DataFrame rebuilt from the updated records
+        df = pd.DataFrame(records)
         df.to_csv(csv_path, index=False)
+    shutdown_probe_pool()
 
     print("\nStarting Clean Up and Export...")
     
     unique_paths = df['Directory_Path'].dropna().unique()
     
-    # 1. Create JSON Indexes
-    for folder_path in unique_paths:
+    # 1. Create JSON Indexes (one groupby pass instead of a column scan per folder)
+    for folder_path, papers_in_folder in df.groupby('Directory_Path', sort=False):
         if not os.path.exists(folder_path): continue
-        papers_in_folder = df[df['Directory_Path'] == folder_path]
         index_data = []
-        for _, paper in papers_in_folder.iterrows():
+        for paper in papers_in_folder.to_dict('records'):
             if paper.get('Is_Downloaded', False):
                 index_data.append({
                     "Title": paper['Title'],
@@ -889,10 +1168,10 @@ def download_library(limit=None, sort_by="Most Relevant", filename_format="Title
     print("Cleaning up target folders...")
     # 1. Clean Leaf Folders (Categories)
     for folder_path in unique_paths:
-        if not os.path.exists(folder_path): continue
         try:
-            files = os.listdir(folder_path)
-            has_pdf = any(f.lower().endswith('.pdf') for f in files)
+            # Stops at the first PDF; a missing folder raises and is skipped
+            with os.scandir(folder_path) as entries:
+                has_pdf = any(e.name.lower().endswith('.pdf') for e in entries)
             # If no PDFs, assume failed category -> nuke it
             if not has_pdf:
                 shutil.rmtree(folder_path)
@@ -919,7 +1198,7 @@ def download_library(limit=None, sort_by="Most Relevant", filename_format="Title
     print("Standardizing metadata and generating catalogs...")
     
     standardized_papers = []
-    for _, row in df.iterrows():
+    for row in df.to_dict('records'):
         # Parse Authors safely
         auth_raw = row.get('Authors', '')
         if pd.isna(auth_raw): auth_raw = ""
@@ -984,7 +1263,7 @@ def download_library(limit=None, sort_by="Most Relevant", filename_format="Title
     scholarstack_root = "./ScholarStack"
     if os.path.exists(topic_root):
         # Zip the entire ScholarStack folder to preserve the directory structure
-        shutil.make_archive(zip_name, 'zip', scholarstack_root)
+        zip_library(f"{zip_name}.zip", scholarstack_root)
         print(f"READY FOR DOWNLOAD: {zip_name}.zip")
     else:
         print(f"ERROR: Folder does not exist: {topic_root}")
@@ -1006,8 +1285,10 @@ if __name__ == "__main__":
     parser.add_argument("--date_end", type=str, default="", help="End Year")
     parser.add_argument("--filename_format", type=str, default="Title", help="PDF Filename Format")
     parser.add_argument("--fast_mode", action="store_true")
+    parser.add_argument("--no_cache", action="store_true", help="Always query the fallbacks (skip data/lookup_cache.sqlite)")
     
     args = parser.parse_args()
+    if args.no_cache: LOOKUP_CACHE_ENABLED = False
     
     # Format Date Range
     d_range = "All Time"
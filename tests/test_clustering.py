@@ -67,5 +67,84 @@ class TestClustering(unittest.TestCase):
         clean = cluster_taxonomy.clean_json_string(raw)
         self.assertEqual(clean, "{\"a\": 1}")
 
+class TestRetryWait(unittest.TestCase):
+    def test_retry_delay_attribute(self):
+        error = Exception("429 Resource exhausted")
+        error.retry_delay = MagicMock(seconds=7)
+        self.assertTrue(7 <= cluster_taxonomy.retry_wait(0, error) < 8)
+
+    def test_hint_in_message(self):
+        proto = Exception("429 Quota exceeded. retry_delay {\n  seconds: 12\n}")
+        self.assertTrue(12 <= cluster_taxonomy.retry_wait(0, proto) < 13)
+        text = Exception("Rate limited, please retry in 3.5s.")
+        self.assertTrue(3.5 <= cluster_taxonomy.retry_wait(0, text) < 4.5)
+
+    def test_exponential_without_hint(self):
+        base = cluster_taxonomy.LLM_RETRY_BASE
+        for attempt in range(cluster_taxonomy.LLM_RETRY_ATTEMPTS - 1):
+            wait = cluster_taxonomy.retry_wait(attempt, Exception("500 Internal"))
+            self.assertTrue(base * 2 ** attempt <= wait < base * 2 ** attempt + 1)
+
+    def test_capped(self):
+        error = Exception("retry in 3600s")
+        self.assertLess(cluster_taxonomy.retry_wait(0, error), cluster_taxonomy.LLM_RETRY_MAX_WAIT + 1)
+
+class TestParseCatalogDates(unittest.TestCase):
+    def test_catalog_format_and_fallback(self):
+        import pandas as pd
+        dates = pd.Series(["2021/03/04", "2019-07-01", "not a date", None])
+        parsed = cluster_taxonomy.parse_catalog_dates(dates)
+        self.assertEqual(parsed[0], pd.Timestamp(2021, 3, 4))
+        self.assertEqual(parsed[1], pd.Timestamp(2019, 7, 1))
+        self.assertTrue(pd.isna(parsed[2]))
+        self.assertTrue(pd.isna(parsed[3]))
+
+class TestBestModelCache(unittest.TestCase):
+    def test_no_cache_skips_model_file(self):
+        import tempfile
+        flash = MagicMock(supported_generation_methods=['generateContent'])
+        flash.name = "models/gemini-2.0-flash"
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "best_model.json"), "w") as f: json.dump({"model": "models/stale"}, f)
+            cluster_taxonomy.get_best_model.cache_clear()
+            self.addCleanup(cluster_taxonomy.get_best_model.cache_clear)
+            with patch.dict(os.environ, {"GEMINI_MODEL": ""}), \
+                 patch.object(cluster_taxonomy, 'LLM_CACHE_DIR', tmp), \
+                 patch.object(cluster_taxonomy, 'LLM_CACHE_ENABLED', False), \
+                 patch.object(cluster_taxonomy.genai, 'list_models', return_value=[flash]):
+                self.assertEqual(cluster_taxonomy.get_best_model(), "models/gemini-2.0-flash")
+            with open(os.path.join(tmp, "best_model.json")) as f:
+                self.assertEqual(json.load(f)["model"], "models/stale")
+
+class TestLLMFailureFallback(unittest.TestCase):
+    def test_local_clustering_when_every_llm_call_fails(self):
+        """Quota/outage on every Gemini call: papers are clustered locally, not dumped in Miscellaneous."""
+        import tempfile
+        import pandas as pd
+        themes = ["binaural rendering headphones", "room acoustics reverberation"]
+        rows = [{"Title": f"Study {i} of {themes[i % 2]} methods", "Description": f"We evaluate {themes[i % 2]} in detail.",
+                 "DOI": f"10.1/{i}", "Search_Vertical": "Audio", "Publication_Date": "2020/01/01"} for i in range(30)]
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            self.addCleanup(os.chdir, cwd)
+            pd.DataFrame(rows).to_csv("research_catalog.csv", index=False)
+            with patch.dict(os.environ, {"GOOGLE_API_KEY": "test"}), \
+                 patch.object(cluster_taxonomy, 'LLM_CACHE_ENABLED', False), \
+                 patch.object(cluster_taxonomy, 'get_best_model', return_value="gemini-test"), \
+                 patch.object(cluster_taxonomy.genai, 'configure'), \
+                 patch.object(cluster_taxonomy.genai, 'GenerativeModel'), \
+                 patch.object(cluster_taxonomy.time, 'sleep'), \
+                 patch.object(cluster_taxonomy, 'generate_json', side_effect=Exception("429 Resource exhausted")) as generate_json:
+                cluster_taxonomy.cluster_and_categorize("Audio", limit=100)
+            categories = pd.read_csv("research_catalog_categorized.csv")['Category']
+
+        self.assertTrue(generate_json.called)
+        self.assertEqual(len(categories), 30)
+        if cluster_taxonomy.HAS_SKLEARN:
+            self.assertFalse(categories.eq("Miscellaneous").any())
+            self.assertGreater(categories.nunique(), 1)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import io
+import os
+import zipfile
+import tempfile
+
+# The file is 3_download_library.py, which is not importable by name: load it with importlib
+import importlib.util
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+spec = importlib.util.spec_from_file_location("download_library", os.path.join(SRC_DIR, "3_download_library.py"))
+download_library = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(download_library)
+
+def fake_response(status, payload):
+    response = MagicMock()
+    response.status_code = status
+    response.json.return_value = payload
+    return response
+
+class TestFindMetaPdfUrl(unittest.TestCase):
+    def test_double_quoted(self):
+        page = b'<head><meta name="citation_pdf_url" content="https://x.org/a.pdf?x=1&amp;y=2"></head>'
+        self.assertEqual(download_library.find_meta_pdf_url(page), "https://x.org/a.pdf?x=1&y=2")
+
+    def test_content_before_name(self):
+        page = b"<META content='https://x.org/b.pdf' NAME=citation_pdf_url />"
+        self.assertEqual(download_library.find_meta_pdf_url(page), "https://x.org/b.pdf")
+
+    def test_missing_or_empty(self):
+        self.assertIsNone(download_library.find_meta_pdf_url(b'<meta name="citation_title" content="A">'))
+        self.assertIsNone(download_library.find_meta_pdf_url(b'<meta name="citation_pdf_url" content="">'))
+
+class TestZipLibrary(unittest.TestCase):
+    def test_pdfs_stored_text_deflated(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = os.path.join(tmp, "Library")
+            os.makedirs(os.path.join(root, "Topic", "Category"))
+            with open(os.path.join(root, "Topic", "Category", "paper.pdf"), "wb") as f: f.write(b"%PDF-1.4" + b"0" * 4096)
+            with open(os.path.join(root, "Topic", "catalog.md"), "w") as f: f.write("# Catalog\n" * 200)
+
+            zip_path = os.path.join(tmp, "library.zip")
+            download_library.zip_library(zip_path, root)
+            with zipfile.ZipFile(zip_path) as zf:
+                infos = {info.filename: info for info in zf.infolist()}
+
+        # Same member names as shutil.make_archive (directories included, relative to root_dir)
+        self.assertIn("Topic/", infos)
+        self.assertIn("Topic/Category/", infos)
+        self.assertEqual(infos["Topic/Category/paper.pdf"].compress_type, zipfile.ZIP_STORED)
+        self.assertEqual(infos["Topic/catalog.md"].compress_type, zipfile.ZIP_DEFLATED)
+
+class TestBatchResolvers(unittest.TestCase):
+    def test_s2_batch_mapping(self):
+        payload = [
+            {'openAccessPdf': {'url': 'https://x.org/a.pdf'}, 'externalIds': {}},
+            None, # S2 does not know this DOI
+            {'openAccessPdf': None, 'externalIds': {'ArXiv': '2101.00001'}},
+            {'openAccessPdf': {'url': 'https://arxiv.org/abs/2101.00002'}, 'externalIds': {}},
+        ]
+        session = MagicMock()
+        session.post.return_value = fake_response(200, payload)
+        with patch.object(download_library, 'api_session', return_value=session):
+            found = download_library.resolve_s2_batch(['10.1/A', '10.1/b', '10.1/c', '10.1/d', '10.1/A'])
+
+        self.assertEqual(session.post.call_count, 1)
+        self.assertEqual(session.post.call_args.kwargs['json'], {'ids': ['DOI:10.1/A', 'DOI:10.1/b', 'DOI:10.1/c', 'DOI:10.1/d']})
+        self.assertEqual(found, {
+            '10.1/a': 'https://x.org/a.pdf',
+            '10.1/c': 'https://arxiv.org/pdf/2101.00001.pdf',
+            '10.1/d': 'https://arxiv.org/pdf/2101.00002.pdf',
+        })
+
+    def test_openalex_batch_mapping(self):
+        payload = {'results': [
+            {'doi': 'https://doi.org/10.1/A', 'best_oa_location': {'pdf_url': 'https://x.org/best.pdf'}, 'locations': []},
+            {'doi': 'https://doi.org/10.1/b', 'best_oa_location': {'pdf_url': None},
+             'locations': [{'pdf_url': None}, {'pdf_url': 'https://y.org/other.pdf'}]},
+            {'doi': 'https://doi.org/10.1/c', 'best_oa_location': None, 'locations': None},
+        ]}
+        session = MagicMock()
+        session.get.return_value = fake_response(200, payload)
+        with patch.object(download_library, 'api_session', return_value=session):
+            found = download_library.resolve_openalex_batch(['10.1/A', '10.1/b', '10.1/c'])
+
+        self.assertEqual(session.get.call_args.kwargs['params']['filter'], 'doi:10.1/a|10.1/b|10.1/c')
+        self.assertEqual(found, {'10.1/a': 'https://x.org/best.pdf', '10.1/b': 'https://y.org/other.pdf', '10.1/c': None})
+
+    def test_openalex_batch_error_status(self):
+        session = MagicMock()
+        session.get.return_value = fake_response(503, {})
+        with patch.object(download_library, 'api_session', return_value=session):
+            self.assertEqual(download_library.resolve_openalex_batch(['10.1/a']), {})
+
+class TestDownloadFile(unittest.TestCase):
+    def stream(self, body, raw=None):
+        if raw is None:
+            raw = MagicMock()
+            raw.read.side_effect = io.BytesIO(body).read
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {'Content-Type': 'application/pdf'}
+        response.raw = raw
+        response.__enter__.return_value = response
+        return response
+
+    def test_pdf_written(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "paper.pdf")
+            body = b"%PDF-1.7" + b"x" * 5000
+            with patch.object(download_library.SESSION, 'get', return_value=self.stream(body)):
+                self.assertTrue(download_library.download_file("https://x.org/paper.pdf", path))
+            with open(path, "rb") as f: self.assertEqual(f.read(), body)
+            self.assertEqual(os.listdir(tmp), ["paper.pdf"])
+
+    def test_interrupted_copy_leaves_nothing(self):
+        raw = MagicMock()
+        raw.read.side_effect = [b"%PDF-1.7" + b"x" * 1016, ConnectionResetError("reset")]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "paper.pdf")
+            with patch.object(download_library.SESSION, 'get', return_value=self.stream(None, raw)):
+                self.assertFalse(download_library.download_file("https://x.org/paper.pdf", path))
+            self.assertEqual(os.listdir(tmp), [])
+
+    def test_html_is_not_saved(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "paper.pdf")
+            with patch.object(download_library.SESSION, 'get', return_value=self.stream(b"<html>landing</html>")):
+                self.assertFalse(download_library.download_file("https://x.org/landing", path))
+            self.assertEqual(os.listdir(tmp), [])
+
+if __name__ == '__main__':
+    unittest.main()
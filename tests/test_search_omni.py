@@ -0,0 +1,123 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import time
+import tempfile
+
+# The file is 1_search_omni.py, which is not importable by name: load it with importlib
+import importlib.util
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+spec = importlib.util.spec_from_file_location("search_omni", os.path.join(SRC_DIR, "1_search_omni.py"))
+search_omni = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(search_omni)
+
+def fake_response(status, headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    return response
+
+class TestRateLimiter(unittest.TestCase):
+    def test_burst_then_paced(self):
+        limiter = search_omni.RateLimiter(20, burst=2)
+        start = time.monotonic()
+        for _ in range(3): limiter.acquire()
+        # Two tokens in the bucket, the third waits ~1/20 s
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_backoff_drains_bucket(self):
+        limiter = search_omni.RateLimiter(10)
+        limiter.backoff(2)
+        self.assertLessEqual(limiter._tokens, -20)
+
+class TestRateLimitedAdapter(unittest.TestCase):
+    def test_session_leaves_429_to_the_adapter(self):
+        """urllib3 must not retry (or raise on) a 429 itself, or backoff() never runs."""
+        session = search_omni.get_session(rate_limits={'api.openalex.org': 10})
+        retry = session.get_adapter('https://api.openalex.org/works').max_retries
+        self.assertFalse(retry.is_retry('GET', 429, has_retry_after=True))
+        self.assertFalse(retry.raise_on_status)
+
+    def test_429_backs_off_and_resends(self):
+        limiter = search_omni.RateLimiter(1000)
+        adapter = search_omni.RateLimitedAdapter({'api.openalex.org': limiter})
+        request = MagicMock(url='https://api.openalex.org/works?page=1')
+        responses = [fake_response(429, {'Retry-After': '0'}), fake_response(200)]
+        with patch.object(search_omni.HTTPAdapter, 'send', side_effect=responses) as send, \
+             patch.object(limiter, 'backoff', wraps=limiter.backoff) as backoff:
+            response = adapter.send(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(send.call_count, 2)
+        backoff.assert_called_once_with(0)
+
+    def test_persistent_429_is_returned(self):
+        limiter = search_omni.RateLimiter(1000)
+        adapter = search_omni.RateLimitedAdapter({'api.openalex.org': limiter})
+        request = MagicMock(url='https://api.openalex.org/works')
+        with patch.object(search_omni.HTTPAdapter, 'send', side_effect=lambda *a, **k: fake_response(429, {'Retry-After': '0'})) as send:
+            response = adapter.send(request)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(send.call_count, search_omni.RATE_LIMIT_RETRIES + 1)
+
+    def test_unlimited_host_is_not_throttled(self):
+        limiter = MagicMock()
+        adapter = search_omni.RateLimitedAdapter({'api.openalex.org': limiter})
+        with patch.object(search_omni.HTTPAdapter, 'send', return_value=fake_response(429)):
+            response = adapter.send(MagicMock(url='https://example.org/paper.pdf'))
+        self.assertEqual(response.status_code, 429)
+        limiter.acquire.assert_not_called()
+
+class TestSeenFilter(unittest.TestCase):
+    def test_membership(self):
+        seen = search_omni.SeenFilter(capacity=1000)
+        seen.update(['10.1/a', '10.1/b'])
+        self.assertIn('10.1/a', seen)
+        self.assertNotIn('10.1/c', seen)
+        self.assertEqual(len(seen), 2)
+
+    def test_window_is_bounded(self):
+        seen = search_omni.SeenFilter(capacity=1000, exact_window=2)
+        for key in ('a', 'b', 'c'): seen.add(key)
+        self.assertIn('c', seen)
+        if search_omni.HAS_BLOOM:
+            # Aged out of the exact window: reported as new rather than risk a false positive
+            self.assertNotIn('a', seen)
+            self.assertEqual(len(seen), 2)
+
+class TestReconstructAbstract(unittest.TestCase):
+    def test_dense_index(self):
+        index = {'Spatial': [0], 'audio': [1, 3], 'and': [2]}
+        self.assertEqual(search_omni.reconstruct_abstract(index), "Spatial audio and audio")
+
+    def test_sparse_index(self):
+        index = {'late': [10], 'early': [2]}
+        self.assertEqual(search_omni.reconstruct_abstract(index), "early late")
+
+    def test_empty(self):
+        self.assertEqual(search_omni.reconstruct_abstract(None), "")
+
+class TestProbeCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = search_omni.ProbeCache(os.path.join(self.tmp.name, "probe.sqlite"), ttl=100, soft_ttl=10)
+
+    def tearDown(self):
+        self.cache._db.close()
+        self.tmp.cleanup()
+
+    def test_ttl_depends_on_reason(self):
+        self.cache.mark_bad('https://x.org/landing', "Not a PDF")
+        self.cache.mark_bad('https://x.org/gone', "HTTP 404")
+        self.assertTrue(self.cache.is_known_bad('https://x.org/landing'))
+        self.assertFalse(self.cache.is_known_bad('https://x.org/other'))
+        with patch.object(search_omni.time, 'time', return_value=time.time() + 50):
+            self.assertFalse(self.cache.is_known_bad('https://x.org/landing'))
+            self.assertTrue(self.cache.is_known_bad('https://x.org/gone'))
+
+class TestCleanJsonString(unittest.TestCase):
+    def test_strips_fence(self):
+        self.assertEqual(search_omni.clean_json_string('```json\n{"verticals": []}\n```'), '{"verticals": []}')
+        self.assertEqual(search_omni.clean_json_string(' ["a"] '), '["a"]')
+
+if __name__ == '__main__':
+    unittest.main()